@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+"""Benchmark of the memory used by parsed climbing sessions held in memory."""
+import argparse
+import copy
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import common.common as common  # noqa: E402
+import common.globals as glbs  # noqa: E402
+from common.session import Counter, Session  # noqa: E402
+
+
+class DictBacked:
+    """An object that stores its attributes in a __dict__, like the models used to."""
+
+
+def to_dict_backed(obj):
+    """
+    Copy a slot based model into an equivalent object backed by a __dict__.
+
+    :param obj: Session, Counter or Project
+    :type obj: object
+    :return: copy of the object
+    :rtype: DictBacked
+    """
+    plain = DictBacked()
+    for cls in type(obj).__mro__:
+        for name in getattr(cls, "__slots__", ()):
+            if not hasattr(obj, name):
+                continue
+            value = getattr(obj, name)
+            if isinstance(value, list) and value and isinstance(value[0], Counter):
+                value = [to_dict_backed(item) for item in value]
+            setattr(plain, name, value)
+    return plain
+
+
+def synthesize(sessions, count, convert=None):
+    """
+    Create a number of sessions by copying parsed sessions.
+
+    :param sessions: parsed climbing sessions
+    :param count: number of sessions to create
+    :param convert: Optional - function applied to every copy
+    :type sessions: list of Session
+    :type count: int
+    :type convert: function
+    :return: copied sessions
+    :rtype: list
+    """
+    copies = []
+    for index in range(count):
+        session = sessions[index % len(sessions)]
+        # Locations are shared between sessions, so they aren't copied
+        session = copy.deepcopy(session, {id(session.Location): session.Location})
+        copies.append(convert(session) if convert else session)
+    return copies
+
+
+def measure(sessions, count, convert=None):
+    """
+    Measure the memory allocated to hold a number of sessions.
+
+    :param sessions: parsed climbing sessions
+    :param count: number of sessions to create
+    :param convert: Optional - function applied to every copy
+    :type sessions: list of Session
+    :type count: int
+    :type convert: function
+    :return: bytes allocated per session
+    :rtype: float
+    """
+    gc.collect()
+    tracemalloc.start()
+    copies = synthesize(sessions, count, convert)
+    gc.collect()
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del copies
+    return allocated / count
+
+
+def main():
+    """Print the memory per session of slot based and __dict__ based models."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "-n", "--number", type=int, default=10000, help="number of sessions"
+    )
+    args = parser.parse_args()
+    logs = common.get_files(glbs.SAMPLE_DATA_DIR, r".*\.yaml$", recursive=False)
+    sessions = [Session(log) for log in logs]
+    counters = sum(len(session.Counters) for session in sessions) / len(sessions)
+    projects = sum(len(session.Projects or []) for session in sessions) / len(sessions)
+    print(
+        f"{args.number} sessions, averaging {counters:.1f} counters"
+        f" and {projects:.1f} projects"
+    )
+    for name, convert in [("__slots__", None), ("__dict__", to_dict_backed)]:
+        per_session = measure(sessions, args.number, convert)
+        print(f"{name:<12}{per_session / 1024:>8.1f} KiB/session")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+"""Micro-benchmark of the time string parser used by climbing logs and bookings."""
+import argparse
+import os
+import re
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import common.timeparse as timeparse  # noqa: E402
+
+# Times as they appear in climbing logs and gym booking slots
+SAMPLES = ["7:30 PM", "10:00 AM", "12:15 PM", "9 AM", "19:30", "08:45"]
+
+
+def legacy_str_to_time(string):
+    """
+    Convert a time string the way it was done before the timeparse module.
+
+    :param string: time in 12 or 24 hour format
+    :type string: str
+    :return: datetime object
+    :rtype: datetime
+    """
+    hh_mm_a = re.compile("^(1[0-2]|0[1-9]):[0-5][0-9] (AM|PM)$")
+    h_mm_a = re.compile("^([1-9]):[0-5][0-9] (AM|PM)$")
+    hh_a = re.compile("^(1[0-2]|0[1-9]) (AM|PM)$")
+    h_a = re.compile("^[1-9] (AM|PM)$")
+    hh_mm = re.compile("^(0[0-9]|1[0-9]|2[0-3]):[0-5][0-9]$")
+    h_mm = re.compile("^([0-9]):[0-5][0-9]$")
+    if hh_mm_a.match(string) or h_mm_a.match(string):
+        return datetime.strptime(string, "%I:%M %p")
+    elif hh_a.match(string) or h_a.match(string):
+        return datetime.strptime(string, "%I %p")
+    elif hh_mm.match(string) or h_mm.match(string):
+        return datetime.strptime(string, "%H:%M")
+    raise ValueError(string)
+
+
+def uncached_str_to_time(string):
+    """
+    Convert a time string with the timeparse module, bypassing the memo.
+
+    :param string: time in 12 or 24 hour format
+    :type string: str
+    :return: datetime object
+    :rtype: datetime
+    """
+    timeparse.parse_time.cache_clear()
+    return timeparse.to_datetime.__wrapped__(string)
+
+
+def main():
+    """Time each parser over the sample times and print the cost per call."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--number", type=int, default=20000)
+    args = parser.parse_args()
+    parsers = {
+        "legacy (regex + strptime)": legacy_str_to_time,
+        "timeparse (uncached)": uncached_str_to_time,
+        "timeparse (memoized)": timeparse.to_datetime,
+        "timeparse.to_12_hour": timeparse.to_12_hour,
+        "timeparse.to_24_hour": timeparse.to_24_hour,
+    }
+    for name, function in parsers.items():
+        seconds = min(
+            timeit.repeat(
+                lambda: [function(sample) for sample in SAMPLES],
+                number=args.number,
+                repeat=3,
+            )
+        )
+        per_call = seconds / (args.number * len(SAMPLES)) * 1e9
+        print(f"{name:<28}{per_call:>10.0f} ns/call")
+
+
+if __name__ == "__main__":
+    main()
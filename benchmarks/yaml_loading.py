@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+"""Benchmark of loading climbing logs with the pure python and libyaml loaders."""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import yaml
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_DATA_DIR = os.path.join(BASE_DIR, "data", "input", "templates", "sample_data")
+
+
+def scale_corpus(source_dir, output_dir, factor):
+    """
+    Copy every climbing log in a directory a number of times.
+
+    :param source_dir: directory of climbing logs
+    :param output_dir: directory to copy the logs into
+    :param factor: number of copies of each log
+    :type source_dir: str
+    :type output_dir: str
+    :type factor: int
+    :return: paths to the copied logs
+    :rtype: list of str
+    """
+    paths = []
+    logs = sorted(file for file in os.listdir(source_dir) if file.endswith(".yaml"))
+    for copy in range(factor):
+        for log in logs:
+            path = os.path.join(output_dir, f"{copy}_{log}")
+            shutil.copyfile(os.path.join(source_dir, log), path)
+            paths.append(path)
+    return paths
+
+
+def load_all(paths, loader):
+    """
+    Load every climbing log with a yaml loader.
+
+    :param paths: paths to climbing logs
+    :param loader: yaml loader class
+    :type paths: list of str
+    :type loader: yaml.Loader
+    :return: seconds taken and the loaded logs
+    :rtype: tuple
+    """
+    start = time.perf_counter()
+    logs = []
+    for path in paths:
+        with open(path, "r") as stream:
+            logs.append(yaml.load(stream, Loader=loader))  # nosec - safe loaders
+    return time.perf_counter() - start, logs
+
+
+def main():
+    """Time both loaders over the scaled up sample data and print the cost per log."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "-s", "--scale", type=int, default=50, help="copies of each sample log"
+    )
+    parser.add_argument(
+        "-i", "--input", default=SAMPLE_DATA_DIR, help="directory of climbing logs"
+    )
+    args = parser.parse_args()
+    loaders = {"SafeLoader (python)": yaml.SafeLoader}
+    if hasattr(yaml, "CSafeLoader"):
+        loaders["CSafeLoader (libyaml)"] = yaml.CSafeLoader
+    else:
+        print("PyYAML was built without libyaml, only the python loader is timed")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = scale_corpus(args.input, tmp_dir, args.scale)
+        print(f"Loading {len(paths)} climbing logs")
+        results = {}
+        for name, loader in loaders.items():
+            seconds, results[name] = load_all(paths, loader)
+            print(f"{name:<24}{seconds / len(paths) * 1e6:>10.0f} us/log")
+    logs = list(results.values())
+    if any(other != logs[0] for other in logs[1:]):
+        print("Loaders returned different results!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
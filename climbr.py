@@ -1,11 +1,14 @@
 #!/usr/bin/python3
 """The core logic behind tracking climbing sessions and stats."""
+import hashlib
+import json
 import os
+import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
 from datetime import datetime
-from time import sleep
 
-import requests
 from loguru import logger
 
 import common.args as cmd_args
@@ -13,7 +16,13 @@ import common.common as common
 import common.globals as glbs
 import common.validate as validate
 import config as config
-from common.session import Session
+from common.manifest import Manifest, hash_file
+from common.session import (
+    get_location,
+    parse_sessions,
+    reduce_sessions,
+    validate_sessions,
+)
 
 
 def error_callback(message):
@@ -88,6 +97,163 @@ def get_session_yamls(path):
     return sessions
 
 
+def find_invalid_logs(session_logs, jobs=None):
+    """
+    Validate climbing logs in parallel and report every error found.
+
+    :param session_logs: paths to climbing logs
+    :param jobs: number of worker processes, defaults to the number of CPUs
+    :type session_logs: list of str
+    :type jobs: int
+    :return: errors of every invalid climbing log, keyed by path
+    :rtype: dict of list
+    """
+    invalid = {}
+    for session_log, errors in validate_sessions(session_logs, jobs=jobs):
+        if errors:
+            invalid[session_log] = errors
+            report_invalid_log(session_log, errors)
+    return invalid
+
+
+def report_invalid_log(session_log, errors):
+    """
+    Log every error of an invalid climbing log.
+
+    :param session_log: path to climbing log
+    :param errors: errors found in the log
+    :type session_log: str
+    :type errors: list of str
+    """
+    logger.warning(
+        f"Invalid climbing log '{os.path.relpath(session_log)}':\n\t"
+        + "\n\t".join(errors)
+    )
+
+
+def open_manifest(cmd, force=False, sparse_counters=False):
+    """
+    Load the manifest of climbing logs parsed by a command.
+
+    :param cmd: command the logs are parsed for (update or demo)
+    :param force: ignore the existing manifest and parse every log again
+    :param sparse_counters: whether counters of grades that weren't climbed are skipped
+    :type cmd: str
+    :type force: bool
+    :type sparse_counters: bool
+    :return: manifest of parsed climbing logs
+    :rtype: Manifest
+    """
+    # Cached documents include location data, so they're invalid if it changes
+    return Manifest(
+        os.path.join(glbs.CACHE_DIR, cmd),
+        rebuild=force,
+        fingerprint=hash_file(glbs.LOCATIONS_FILE),
+        options={"sparse_counters": sparse_counters},
+    )
+
+
+def get_previous_documents(manifest):
+    """
+    Return the documents uploaded by the last update, if Elasticsearch still has them.
+
+    Every command shares the same indices, and they can be recreated by 'init' or
+    a new Elasticsearch volume, so the documents recorded by the last update are
+    only trusted if the indices still point to the generations they were
+    uploaded to, and hold the same number of documents.
+
+    :param manifest: manifest of parsed climbing logs
+    :type manifest: Manifest
+    :return: content hashes keyed by index and document id (empty to upload
+        everything), and the generation of every index
+    :rtype: tuple of dict
+    """
+    previous, generations = manifest.get_documents()
+    for index, documents in previous.items():
+        generation = common.get_alias_generation(es_url, index)
+        if generation != generations.get(index) or common.count_documents(
+            es_url, index
+        ) != len(documents):
+            logger.info(
+                f"'{index}' doesn't match the last update, uploading every document..."
+            )
+            return {}, {}
+    return previous, generations
+
+
+def clear_caches():
+    """Forget the logs parsed and documents uploaded by every command."""
+    for cmd in ["update", "demo"]:
+        path = os.path.join(glbs.CACHE_DIR, cmd)
+        if os.path.isdir(path):
+            logger.debug(f"Clearing cache '{path}'...")
+            shutil.rmtree(path)
+
+
+def parse_changed_logs(args, manifest, session_logs, changed_logs):
+    """
+    Parse new or modified climbing logs, exit unless invalid logs can be skipped.
+
+    Logs are validated as they are parsed, and every error of every log is
+    reported at once.
+
+    :param args: command line arguments
+    :param manifest: manifest the documents of valid logs are cached in
+    :param session_logs: paths to every climbing log
+    :param changed_logs: paths to new or modified climbing logs, invalid logs
+        are removed from it
+    :type args: dict
+    :type manifest: Manifest
+    :type session_logs: list of str
+    :type changed_logs: set of str
+    :return: paths to every valid climbing log
+    :rtype: list of str
+    """
+    invalid = {}
+    for log, record, errors in parse_sessions(
+        [log for log in session_logs if log in changed_logs], jobs=args.jobs
+    ):
+        if errors:
+            invalid[log] = errors
+            report_invalid_log(log, errors)
+        else:
+            manifest.put(log, record)
+    if invalid and not args.keep_going:
+        logger.error(
+            f"{len(invalid)} climbing logs are invalid, fix the errors above"
+            " or use --keep-going to skip them"
+        )
+        sys.exit(1)
+    elif invalid:
+        logger.warning(f"Skipping {len(invalid)} invalid climbing logs...")
+        changed_logs.difference_update(invalid)
+        return [log for log in session_logs if log not in invalid]
+    return session_logs
+
+
+def validate_logs(args):
+    """
+    Check climbing logs for errors, reporting every error in every log.
+
+    :param args: command line arguments
+    :type args: dict
+    """
+    session_logs = []
+    for path in args.validate_path or [glbs.INPUT_DIR]:
+        if os.path.isdir(path):
+            session_logs.extend(get_session_yamls(path))
+        else:
+            session_logs.append(validate.file(path))
+    invalid = find_invalid_logs(session_logs, jobs=args.jobs)
+    if invalid:
+        logger.error(
+            f"{len(invalid)} of {len(session_logs)} climbing logs are invalid,"
+            " see the errors above"
+        )
+        sys.exit(1)
+    logger.info(f"All {len(session_logs)} climbing logs are valid!")
+
+
 def log_session(args):
     """
     Create a climbing session file.
@@ -178,6 +344,10 @@ def update(args, cmd):
     """
     Update Elasticsearch with latest data.
 
+    Only logs that are new or modified since the last update are parsed.
+    Documents have stable ids, so only documents whose content has changed are
+    uploaded, and documents of logs that no longer exist are deleted.
+
     :param args: command line arguments
     :type args: dict
     """
@@ -187,84 +357,169 @@ def update(args, cmd):
         session_logs = get_session_yamls(glbs.SAMPLE_DATA_DIR)
     else:
         session_logs = get_session_yamls(glbs.INPUT_DIR)
-    sessions = []
-    session_data = []
-    project_data = []
-    counter_data = []
-    project_list = {}
-    logger.info("[2/5] Enhancing and normalizing data...")
-    for log in session_logs:
-        # Creating Session class from logs
-        climbing_session = Session(log)
-        # Create and maintain a running list of projects
-        # Including a total counter across all Sessions
-        if climbing_session.Projects:
-            for project in climbing_session.Projects:
-                if project.name in project_list.keys():
-                    updated_total = [
-                        x + y
-                        for x, y in zip(
-                            project_list[project.name].get_counters(),
-                            project.get_counters(),
-                        )
-                    ]
-                    # Remove is_last from the previous project instance
-                    # and assign the new value to the current project
-                    project_list[project.name].set_is_last(False)
-                    project.set_is_last(True)
-                    # Increase the running counters
-                    # and update the project with the current running counter
-                    project.set_total_counter(
-                        updated_total[0],
-                        updated_total[1],
-                        updated_total[3],
-                        updated_total[4],
-                        updated_total[5],
-                        updated_total[6],
-                    )
-                    # del project_list[project.name]
-                    project_list[project.name] = project
-                # If the project isn't in the running list, add it.
-                # Total counter is default the same as counter
-                else:
-                    project.set_is_last(True)
-                    project_list[project.name] = project
-        sessions.append(climbing_session)
-
-    # Loop through the list of Sessions and update the output lists
-    for session in sessions:
-        session_data.append(session.toDict())
-        counter_data.extend(session.getCounters())
-        project_data.extend(session.getProjects())
+    bulk_files = {
+        index: os.path.join(
+            data_dir, f"{index}.json" if cmd == "update" else f"{index}_demo.json"
+        )
+        for index in ["sessions", "counters", "projects"]
+    }
+    sparse_counters = (
+        getattr(config, "sparse_counters", False)
+        if args.sparse_counters is None
+        else args.sparse_counters
+    )
+    manifest = open_manifest(cmd, args.force, sparse_counters)
+    changed_logs = set(manifest.refresh(session_logs))
+    # Content hash of the documents from the last update, keyed by id. Without
+    # Elasticsearch, json is still written but nothing is recorded as uploaded
+    es_available = common.is_es_available(es_url)
+    if es_available:
+        previous, generations = get_previous_documents(manifest)
+    else:
+        previous, generations = manifest.get_documents()
+    # Options such as sparse counters change the documents of every log
+    if (
+        previous
+        and not (changed_logs or manifest.removed or manifest.options_changed)
+        and all(os.path.isfile(path) for path in bulk_files.values())
+    ):
+        manifest.save()
+        logger.info("No new or modified climbing logs found, everything is up to date!")
+        return
+    logger.info(
+        "[2/5] Enhancing and normalizing data "
+        f"({len(changed_logs)} new or modified logs)..."
+    )
+    # Parse new logs in parallel, otherwise reuse the documents from the last update
+    session_logs = parse_changed_logs(args, manifest, session_logs, changed_logs)
     logger.info("[3/5] Writing climbing data to json...")
-    common.write_bulk_api(
-        session_data,
-        os.path.join(
-            data_dir,
-            "sessions.json" if cmd == "update" else "sessions_demo.json",
-        ),
-        "sessions",
+    current = {index: {} for index in bulk_files}
+    with ExitStack() as stack:
+        writers = {}
+        deltas = {}
+        for index, path in bulk_files.items():
+            writers[index] = stack.enter_context(common.BulkWriter(path, index))
+            deltas[index] = stack.enter_context(
+                common.BulkWriter(
+                    os.path.join(manifest.directory, f"{index}_delta.json"), index
+                )
+            )
+        # Stream sessions in chronological order to apply the running project totals
+        records = (manifest.get(log) for log in manifest.sort(session_logs))
+        for index, id, document in reduce_sessions(records, sparse_counters):
+            # Keep documents that share the same natural key, ie. repeated projects
+            if id in current[index]:
+                duplicate = 2
+                while f"{id}-{duplicate}" in current[index]:
+                    duplicate += 1
+                id = f"{id}-{duplicate}"
+            source = json.dumps(document)
+            digest = hashlib.sha1(source.encode("utf-8")).hexdigest()  # nosec
+            current[index][id] = digest
+            writers[index].write(source, id=id)
+            # Only upload documents that are new or have changed
+            if previous.get(index, {}).get(id) != digest:
+                deltas[index].write(source, id=id)
+        # Remove documents whose climbing log no longer exists
+        for index in bulk_files:
+            for id in previous.get(index, {}).keys() - current[index].keys():
+                deltas[index].delete(id)
+        # Importing changed data into elasticSearch
+        # before replacing the data from the last update
+        logger.info("[4/5] Uploading changes into ElasticSearch...")
+        for index, delta in deltas.items():
+            delta.close()
+            if not es_available:
+                logger.debug(f"Skipping {delta.count} changes to '{index}'...")
+            elif not previous:
+                # Every document changed, load them into a new generation of
+                # the index so dashboards keep working until it's ready
+                logger.debug(f"Rebuilding '{index}' with {delta.count} documents...")
+                generations[index] = common.rebuild_index(
+                    es_url,
+                    index,
+                    validate.file(
+                        os.path.join(glbs.ES_MAPPINGS, f"{index}_mapping.json")
+                    ),
+                    delta.output_path,
+                )
+            elif delta.count:
+                logger.debug(f"Uploading {delta.count} changes to '{index}'...")
+                common.upload_to_es(es_url, delta.output_path)
+            common.delete_file(delta.output_path)
+    if not es_available:
+        # The manifest isn't saved, so the next update parses and uploads these logs
+        logger.error(
+            "Unable to ping Elasticsearch, climbing data was written to json"
+            " but not uploaded. Please confirm connection and try again."
+        )
+        sys.exit(1)
+    manifest.set_documents(current, generations)
+    manifest.save()
+    logger.info("[5/5] Visualizations and stats are ready at" f" {kibana_url}/app/home")
+
+
+def stats(args):
+    """
+    Print climbing stats computed locally, without Elasticsearch or Kibana.
+
+    Logs are parsed the same way as for an update, but cached separately so
+    the logs of the next update are still seen as new or modified.
+
+    :param args: command line arguments
+    :type args: dict
+    """
+    cmd = "demo" if args.demo else "update"
+    session_logs = get_session_yamls(
+        glbs.SAMPLE_DATA_DIR if args.demo else glbs.INPUT_DIR
     )
-    common.write_bulk_api(
-        counter_data,
-        os.path.join(
-            data_dir,
-            "counters.json" if cmd == "update" else "counters_demo.json",
-        ),
-        "counters",
+    location = None
+    if args.stats_location:
+        location = get_location(args.stats_location)
+        if location is None:
+            logger.error(f"Unknown location '{args.stats_location}'")
+            sys.exit(1)
+        location = location.name
+    # Counters are only reduced for updates, so sparse counters don't apply
+    manifest = open_manifest(os.path.join("stats", cmd), args.force)
+    changed_logs = set(manifest.refresh(session_logs))
+    session_logs = parse_changed_logs(args, manifest, session_logs, changed_logs)
+    manifest.save()
+    try:
+        import common.stats as climbing_stats
+    except ImportError:
+        logger.error(
+            "The 'stats' command requires pandas and numpy,"
+            " install them with 'poetry install -E stats'"
+        )
+        sys.exit(1)
+    results = climbing_stats.compute_stats(
+        (manifest.get(log) for log in manifest.sort(session_logs)),
+        reports=args.reports,
+        location=location,
     )
-    common.write_bulk_api(
-        project_data,
-        os.path.join(
-            data_dir,
-            "projects.json" if cmd == "update" else "projects_demo.json",
-        ),
-        "projects",
+    if args.json:
+        print(climbing_stats.to_json(results))
+    else:
+        print(climbing_stats.to_text(results))
+
+
+def init_index(index, force=False):
+    """
+    Create an Elasticsearch index and its Kibana index pattern.
+
+    :param index: name of the index
+    :param force: overwrite the existing index and index pattern
+    :type index: str
+    :type force: bool
+    """
+    common.create_index(
+        es_url,
+        index,
+        validate.file(os.path.join(glbs.ES_MAPPINGS, f"{index}_mapping.json")),
+        force=force,
     )
-    # Importing all data into elasticSearch
-    logger.info("[4/5] Uploading data into ElasticSearch...")
-    common.upload_to_es(es_url, data_dir)
-    logger.info("[5/5] Visualizations and stats are ready at" f" {kibana_url}/app/home")
+    common.create_index_pattern(kibana_url, index, force=force)
 
 
 def init(args):
@@ -276,41 +531,26 @@ def init(args):
     """
     # Need to wait for Kibana and ES to start up whilst using docker
     # For maintainability, writeing this here instead of bash + docker-compose
-    if "DOCKER" in os.environ:
-        waiting = True
-        timeout_counter = 0
-        # Wait to establish connection, and timeout if it takes too long
-        while waiting:
-            try:
-                response = requests.get(kibana_url).status_code
-            # Catching error if ES/Kibana isn't ready yet
-            except Exception:
-                response = 400
-                pass
-
-            if response == 200:
-                waiting = False
-            else:
-                if timeout_counter >= 5:
-                    logger.error(f"Unable to ping Kibana at '{kibana_url}'")
-                    sys.exit(1)
-                logger.warning(
-                    "ElasticSearch and Kibana services are not ready yet,"
-                    " trying again in 60 seconds..."
-                )
-                sleep(60)
-                timeout_counter += 1
+    if "DOCKER" in os.environ and not common.wait_for_services(es_url, kibana_url):
+        logger.error("ElasticSearch and Kibana services are not ready")
+        sys.exit(1)
 
     # Preparing Elasticsearch and Kibana for data consumption
-    for index in glbs.ES_INDEX_NAME:
-        common.create_index(
-            es_url,
-            index,
-            validate.file(os.path.join(glbs.ES_MAPPINGS, f"{index}_mapping.json")),
-            force=args.force,
-        )
-        common.create_index_pattern(kibana_url, index, force=args.force)
-    # Importing visualizations
+    if args.force:
+        # Indices are recreated empty, so every document must be uploaded again
+        clear_caches()
+        # Indices are independent, so set them up in parallel when not prompting
+        with ThreadPoolExecutor(max_workers=glbs.INIT_THREADS) as executor:
+            futures = [
+                executor.submit(init_index, index, args.force)
+                for index in glbs.ES_INDEX_NAME
+            ]
+            for future in as_completed(futures):
+                future.result()
+    else:
+        for index in glbs.ES_INDEX_NAME:
+            init_index(index, args.force)
+    # Importing visualizations once every index pattern they use exists
     common.import_kibana(
         kibana_url,
         ndjson=common.get_files(glbs.ES_DIR, "visualizations.ndjson").pop(),
@@ -340,6 +580,10 @@ def main():
         import_files(args)
     elif cmd == "log":
         log_session(args)
+    elif cmd == "validate":
+        validate_logs(args)
+    elif cmd == "stats":
+        stats(args)
 
 
 if __name__ == "__main__":
@@ -90,7 +90,7 @@ def init():
         formatter_class=custom_formatter,
     )
     # Update command
-    update_cmd = subparsers.add_parser(  # noqa
+    update_cmd = subparsers.add_parser(
         "update",
         parents=[parent_parser],
         add_help=False,
@@ -134,13 +134,107 @@ def init():
         help="Path to the ndjson object file(s) or directory",
     )
     # Importing demo files
-    demo_cmd = subparsers.add_parser(  # noqa
+    demo_cmd = subparsers.add_parser(
         "demo",
         parents=[parent_parser],
         add_help=False,
         help="Use sample data to demo climbr visualizations",
         formatter_class=custom_formatter,
     )
+    # Validate climbing logs
+    validate_cmd = subparsers.add_parser(
+        "validate",
+        parents=[parent_parser],
+        add_help=False,
+        help="Check climbing logs for errors",
+        formatter_class=custom_formatter,
+    )
+    validate_cmd.add_argument(
+        "validate_path",
+        nargs="*",
+        metavar="<path>",
+        help="Path to the climbing log(s) or directory (Default: data/input)",
+    )
+    # Compute climbing stats without Elasticsearch
+    stats_cmd = subparsers.add_parser(
+        "stats",
+        parents=[parent_parser],
+        add_help=False,
+        help="Print climbing stats without Elasticsearch or Kibana",
+        formatter_class=custom_formatter,
+    )
+    stats_cmd.add_argument(
+        "-r",
+        "--report",
+        action="append",
+        choices=["pyramid", "send-rate", "weekly", "duration"],
+        dest="reports",
+        metavar="report",
+        help="Stats to print, can be repeated: pyramid, send-rate, weekly, duration"
+        " (Default: all)",
+    )
+    stats_cmd.add_argument(
+        "-l",
+        "--location",
+        dest="stats_location",
+        type=str.lower,
+        metavar="location",
+        help="Only include sessions at a location",
+    )
+    stats_cmd.add_argument(
+        "--demo",
+        action="store_true",
+        dest="demo",
+        help="Use sample data instead of your climbing logs",
+    )
+    stats_cmd.add_argument(
+        "--json",
+        action="store_true",
+        dest="json",
+        help="Print stats as json",
+    )
+    stats_cmd.add_argument(
+        "-k",
+        "--keep-going",
+        action="store_true",
+        dest="keep_going",
+        help="Skip invalid climbing logs",
+    )
+    for cmd in [update_cmd, demo_cmd]:
+        cmd.add_argument(
+            "-k",
+            "--keep-going",
+            action="store_true",
+            dest="keep_going",
+            help="Skip invalid climbing logs instead of stopping the update",
+        )
+        # Overrides 'sparse_counters' in config.py either way
+        sparse_option = cmd.add_mutually_exclusive_group()
+        sparse_option.add_argument(
+            "--sparse-counters",
+            action="store_true",
+            default=None,
+            dest="sparse_counters",
+            help="Only index the counters of grades that were climbed",
+        )
+        sparse_option.add_argument(
+            "--no-sparse-counters",
+            action="store_false",
+            dest="sparse_counters",
+            help="Index a counter for every grade, even if sparse_counters is set"
+            " in config.py",
+        )
+    # Options shared by commands that parse climbing logs
+    for cmd in [update_cmd, demo_cmd, validate_cmd, stats_cmd]:
+        cmd.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            dest="jobs",
+            metavar="jobs",
+            help="Number of processes used to parse climbing logs"
+            " (Default: number of CPUs)",
+        )
     args = parser.parse_args()
     # If "py climb.py" called without subparser, then just display help
     if args.command is None:
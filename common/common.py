@@ -6,34 +6,203 @@ import os
 import re
 import shutil
 import smtplib
+import stat
 import sys
-import urllib
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 from email import encoders
 from email.mime.base import MIMEBase
 from email.mime.image import MIMEImage
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from urllib.parse import urljoin
 
 import firebase_admin
 import requests
 import yaml
 from dotenv import load_dotenv
-from elasticsearch import Elasticsearch
+from elasticsearch import Elasticsearch, helpers
 from firebase_admin import credentials, firestore
 from loguru import logger
 
+import common.globals as glbs
+import common.kibana as kibana
+import common.timeparse as timeparse
 import common.validate as validate
 
+# Use the libyaml bindings when PyYAML was built with them, both construct the
+# same python objects (ie. datetime.date) from a yaml file
+try:
+    from yaml import CSafeDumper as YamlDumper
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeDumper as YamlDumper
+    from yaml import SafeLoader as YamlLoader
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(BASE_DIR)
 import config as config  # noqa
 
+# Elasticsearch clients shared by the whole process, keyed by url
+_ES_CLIENTS = {}
+_ES_CLIENTS_LOCK = threading.Lock()
+
+
+class BulkWriter:
+    """
+    Write documents in bulk api format as they are produced.
+
+    Action and document lines are streamed through a large buffer into a
+    temporary file, which only replaces the output path once every document has
+    been written. If writing fails part way, the previous file is left untouched.
+
+    When appending, documents are written to the end of the output path instead,
+    without copying it, and it is truncated back to its original size on error.
+
+    :param output_path: the path to the json in bulk api format
+    :param index_name: Index name for elasticsearch
+    :param start_id: id assigned to the first document written without an id
+    :param append: keep the existing contents of the output path
+    :type output_path: str
+    :type index_name: str
+    :type start_id: int
+    :type append: bool
+    """
+
+    buffer_size = 1 << 20
+
+    def __init__(self, output_path, index_name, start_id=0, append=False):
+        """Open a temporary file next to the output path."""
+        self.output_path = output_path
+        self.index_name = index_name
+        self.next_id = start_id
+        self.count = 0
+        if append and os.path.isfile(output_path):
+            self.tmp_path = None
+            self.file = open(output_path, "a", buffering=self.buffer_size)
+            self.start_size = self.file.tell()
+        else:
+            fd, self.tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(os.path.abspath(output_path)), suffix=".tmp"
+            )
+            os.close(fd)
+            # mkstemp only gives access to the owner, keep the mode of the output
+            os.chmod(
+                self.tmp_path,
+                stat.S_IMODE(os.stat(output_path).st_mode)
+                if os.path.isfile(output_path)
+                else 0o644,
+            )
+            self.file = open(self.tmp_path, "w", buffering=self.buffer_size)
+        # Only the id changes between action lines
+        self.index_action = '{"index": {"_index": %s, "_id": ' % json.dumps(index_name)
+        self.delete_action = '{"delete": {"_index": %s, "_id": ' % json.dumps(
+            index_name
+        )
+
+    def __enter__(self):
+        """Return the writer to be used as a context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Replace the output path, or discard everything if an error occured."""
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def write(self, document, id=None):
+        """
+        Write an index action and its document.
+
+        :param document: document to index, or the document already serialized
+        :param id: id of the document, defaults to the next id in sequence
+        :type document: dict or str
+        :type id: int or str
+        :return: id of the document
+        :rtype: int or str
+        """
+        if id is None:
+            id = self.next_id
+            self.next_id += 1
+        self.file.write(f"{self.index_action}{json.dumps(id)}}}}}\n")
+        self.file.write(document if isinstance(document, str) else json.dumps(document))
+        self.file.write("\n")
+        self.count += 1
+        return id
+
+    def delete(self, id):
+        """
+        Write a delete action.
+
+        :param id: id of the document to delete
+        :type id: int or str
+        """
+        self.file.write(f"{self.delete_action}{json.dumps(id)}}}}}\n")
+        self.count += 1
+
+    def close(self):
+        """Flush all documents and move the file to the output path."""
+        if self.file.closed:
+            return
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        if self.tmp_path:
+            os.replace(self.tmp_path, self.output_path)
+
+    def discard(self):
+        """Delete the temporary file, or what was appended, leaving the output path."""
+        if not self.file.closed:
+            self.file.close()
+        if self.tmp_path:
+            delete_file(self.tmp_path)
+        else:
+            os.truncate(self.output_path, self.start_size)
+
+
+def chunk_bulk_actions(actions, chunk_size, max_chunk_bytes):
+    """
+    Group bulk actions into chunks limited by number of documents and size.
+
+    : param actions: action and document lines
+    : param chunk_size: maximum number of documents in a chunk
+    : param max_chunk_bytes: maximum size of a chunk in bytes
+    : type actions: iterable of tuple
+    : type chunk_size: int
+    : type max_chunk_bytes: int
+    : return: generator of chunks
+    : rtype: generator of list
+    """
+    chunk = []
+    chunk_bytes = 0
+    for action, document in actions:
+        action_bytes = len(action.encode("utf-8")) + 1
+        if document is not None:
+            action_bytes += len(document.encode("utf-8")) + 1
+        if chunk and (
+            len(chunk) >= chunk_size or chunk_bytes + action_bytes > max_chunk_bytes
+        ):
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+        chunk.append((action, document))
+        chunk_bytes += action_bytes
+    if chunk:
+        yield chunk
+
 
 def connect_to_es(es_url):
     """
     Connect to Elasticsearch and return ES object.
 
+    A single client is created per url and shared by every call in the process,
+    reusing its pool of keep-alive connections. Elasticsearch is only pinged
+    when the client is created.
+
     Raises exception if unable to ping.
 
     :param es_url: url to the Elasticsearch instance
@@ -42,13 +211,39 @@ def connect_to_es(es_url):
     :rtype: obj
     :raises Exception: Elasticsearch is not running
     """
-    es = Elasticsearch([es_url], verify_certs=True)
-    if not es.ping():
+    if not is_es_available(es_url):
         logger.error(
             "Unable to ping Elasticsearch, please confirm connection and try again."
         )
         sys.exit(1)
-    return es
+    return _ES_CLIENTS[es_url]
+
+
+def is_es_available(es_url):
+    """
+    Check if Elasticsearch can be reached, without exiting if it can't.
+
+    The client is kept for connect_to_es once Elasticsearch could be pinged.
+
+    :param es_url: url to the Elasticsearch instance
+    :type: str
+    :return: True if Elasticsearch responded to a ping
+    :rtype: bool
+    """
+    with _ES_CLIENTS_LOCK:
+        if es_url not in _ES_CLIENTS:
+            es = Elasticsearch(
+                [es_url],
+                verify_certs=True,
+                maxsize=glbs.ES_MAX_CONNECTIONS,
+                timeout=glbs.ES_TIMEOUT,
+                retry_on_timeout=True,
+                max_retries=glbs.ES_MAX_RETRIES,
+            )
+            if not es.ping():
+                return False
+            _ES_CLIENTS[es_url] = es
+    return True
 
 
 def connect_to_firestore():
@@ -107,10 +302,173 @@ def copy_file(src, dest, file_name=""):
         return dest_path
 
 
+def get_index_generations(es, index_name):
+    """
+    Return every generation of an index, oldest first.
+
+    : param es: ES Instance
+    : param index_name: Name of the alias the generations are behind
+    : type es: obj
+    : type index_name: str
+    : return: names of the generations
+    : rtype: list of str
+    """
+    pattern = re.compile(rf"{re.escape(index_name)}-\d{{20}}")
+    return sorted(
+        index for index in es.indices.get(f"{index_name}-*") if pattern.fullmatch(index)
+    )
+
+
+def count_documents(es_url, index_name):
+    """
+    Count the documents searchable in an index.
+
+    : param es_url: url to Elasticsearch instance
+    : param index_name: Name of index or alias
+    : type es_url: str
+    : type index_name: str
+    : return: number of documents, None if the index doesn't exist
+    : rtype: int
+    """
+    es = connect_to_es(es_url)
+    if not es.indices.exists(index_name):
+        return None
+    # Documents uploaded since the last refresh aren't counted otherwise
+    es.indices.refresh(index_name)
+    return es.count(index=index_name)["count"]
+
+
+def get_alias_generation(es_url, index_name):
+    """
+    Return the generation an alias points to.
+
+    : param es_url: url to Elasticsearch instance
+    : param index_name: Name of the alias
+    : type es_url: str
+    : type index_name: str
+    : return: name of the generation, None if the alias doesn't exist
+    : rtype: str
+    """
+    es = connect_to_es(es_url)
+    if not es.indices.exists_alias(name=index_name):
+        return None
+    return ",".join(sorted(es.indices.get_alias(name=index_name)))
+
+
+def create_index_generation(es_url, index_name, mapping_path, bulk_load=False):
+    """
+    Create a new generation of an index, named after the index and current time.
+
+    : param es_url: url to Elasticsearch instance
+    : param index_name: Name of the alias the generation will be behind
+    : param mapping_path: Path to a json
+    : param bulk_load: disable refreshes and replicas until the generation is
+        promoted, to speed up loading every document
+    : type es_url: str
+    : type index_name: str
+    : type mapping_path: str
+    : type bulk_load: bool
+    : raises Exception: Unable to create index from mapping
+    : return: name of the generation
+    : rtype: str
+    """
+    es = connect_to_es(es_url)
+    mapping = json.loads(load_file(mapping_path))
+    if bulk_load:
+        mapping.setdefault("settings", {}).setdefault("index", {}).update(
+            {"refresh_interval": -1, "number_of_replicas": 0}
+        )
+    generation = f"{index_name}-{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+    try:
+        logger.debug(f"Creating {generation} index...")
+        es.indices.create(generation, body=mapping)
+    except Exception:
+        logger.error(f"Unable to create ElasticSearch mapping from '{mapping_path}'.")
+        sys.exit(1)
+    return generation
+
+
+def promote_index_generation(
+    es_url, index_name, generation, keep=glbs.ES_INDEX_GENERATIONS
+):
+    """
+    Point an alias to a generation of an index, and delete older generations.
+
+    The alias is swapped in a single request, so searches never see an empty or
+    partially loaded index. An index created before generations were used is
+    replaced by the alias.
+
+    : param es_url: url to Elasticsearch instance
+    : param index_name: Name of the alias
+    : param generation: Name of the generation to promote
+    : param keep: number of generations to keep, including the promoted one
+    : type es_url: str
+    : type index_name: str
+    : type generation: str
+    : type keep: int
+    """
+    es = connect_to_es(es_url)
+    # Restore the settings disabled while loading, null resets to the default
+    es.indices.put_settings(
+        index=generation,
+        body={"index": {"refresh_interval": None, "number_of_replicas": None}},
+    )
+    es.indices.refresh(generation)
+    actions = [{"add": {"index": generation, "alias": index_name}}]
+    if es.indices.exists_alias(name=index_name):
+        actions.extend(
+            {"remove": {"index": index, "alias": index_name}}
+            for index in es.indices.get_alias(name=index_name)
+            if index != generation
+        )
+    elif es.indices.exists(index_name):
+        actions.append({"remove_index": {"index": index_name}})
+    es.indices.update_aliases(body={"actions": actions})
+    logger.debug(f"'{index_name}' now points to {generation}")
+    # Delete the oldest generations, the promoted one is always kept
+    old = get_index_generations(es, index_name)
+    old.remove(generation)
+    for index in old[: max(len(old) - keep + 1, 0)]:
+        logger.debug(f"Deleting old index {index}...")
+        es.indices.delete(index)
+
+
+def rebuild_index(es_url, index_name, mapping_path, path):
+    """
+    Upload a bulk json into a new generation of an index, then promote it.
+
+    The live index keeps serving searches until every document is loaded.
+
+    : param es_url: url to Elasticsearch instance
+    : param index_name: Name of the alias
+    : param mapping_path: Path to a json
+    : param path: path to json in bulk api format
+    : type es_url: str
+    : type index_name: str
+    : type mapping_path: str
+    : type path: str
+    : return: name of the promoted generation
+    : rtype: str
+    """
+    generation = create_index_generation(
+        es_url, index_name, mapping_path, bulk_load=True
+    )
+    try:
+        upload_to_es(es_url, path, index_name=generation)
+    except BaseException:
+        # Don't leave a partially loaded generation behind
+        connect_to_es(es_url).indices.delete(generation, ignore_unavailable=True)
+        raise
+    promote_index_generation(es_url, index_name, generation)
+    return generation
+
+
 def create_index(es_url, index_name, mapping_path, force=False):
     """
     Create an Elasticsearch index (table) using a mapping to define field types.
 
+    The index is an alias to a generation of the index, see rebuild_index.
+
     :param es_url: url to Elasticsearch instance
     :param index_name: Name of index
     :param mapping_path: Path to a json
@@ -126,8 +484,7 @@ def create_index(es_url, index_name, mapping_path, force=False):
     # Check for old indexes
     if es.indices.exists(index_name):
         if force:
-            logger.debug(f"Deleting index {index_name}...")
-            es.indices.delete(index_name)
+            delete_index(es, index_name)
         else:
             valid_input = False
             while not valid_input:
@@ -139,25 +496,53 @@ def create_index(es_url, index_name, mapping_path, force=False):
                 value = input(question).lower()
                 logger.debug(f"{question} {value}")
                 if value == "y":
-                    logger.info(f"Deleting index {index_name}...")
-                    es.indices.delete(index_name)
+                    delete_index(es, index_name)
                     valid_input = True
                 if value == "n":
                     logger.debug(f"Skipping index creation for '{index_name}'.")
                     return
-    mapping = load_file(mapping_path)
-    try:
-        logger.debug(f"Creating {index_name} index...")
-        es.indices.create(index_name, body=mapping)
-        logger.debug(f"Successfully created {index_name} index!")
-    except Exception:
-        logger.error(f"Unable to create ElasticSearch mapping from '{mapping_path}'.")
-        sys.exit(1)
+    generation = create_index_generation(es_url, index_name, mapping_path)
+    promote_index_generation(es_url, index_name, generation)
+    logger.debug(f"Successfully created {index_name} index!")
+
+
+def delete_index(es, index_name):
+    """
+    Delete an index, along with every generation of it.
+
+    : param es: ES Instance
+    : param index_name: Name of index or alias
+    : type es: obj
+    : type index_name: str
+    """
+    logger.debug(f"Deleting index {index_name}...")
+    indices = set(es.indices.get(index_name, ignore_unavailable=True))
+    indices.update(get_index_generations(es, index_name))
+    if indices:
+        es.indices.delete(",".join(sorted(indices)))
+
+
+def index_pattern_exists(kibana_url, index_name):
+    """
+    Check if Kibana already has an index pattern for an index.
+
+    :param kibana_url: url to the Kibana instance
+    :param index_name: Name of index
+    :type kibana_url: str
+    :type index_name: str
+    :raises Exception: Unable to ping Kibana instance
+    :return: True if the index pattern exists
+    :rtype: bool
+    """
+    client = kibana.get_client(kibana_url)
+    client.ensure_ready()
+    response = client.get(f"api/saved_objects/index-pattern/{index_name}")
+    return response.status_code == 200
 
 
 def create_index_pattern(kibana_url, index_name, force=False):
     """
-    Create a Kibana index pattern by calling a cURL command.
+    Create a Kibana index pattern through the Kibana API.
 
     :param kibana_url: url to the Kibana instance
     :param index_name: Name of index
@@ -174,25 +559,19 @@ def create_index_pattern(kibana_url, index_name, force=False):
         "counters": "session.date",
         "sessions": "date",
     }
-    timefield = (
-        f', "timeFieldName":"{timefields[index_name]}"'
-        if index_name in timefields.keys()
-        else ""
-    )
-    headers = {"kbn-xsrf": "true", "Content-Type": "application/json"}
-    data = '{{ "attributes": {{ "title": "{}*" {}}} }}'.format(index_name, timefield)
+    # Match the alias only, not every generation behind it
+    attributes = {"title": index_name}
+    if index_name in timefields.keys():
+        attributes["timeFieldName"] = timefields[index_name]
     # Try to ping Kibana
-    if requests.get(kibana_url).status_code != 200:
-        logger.error(f"Unable to ping Kibana instance located at '{kibana_url}'.")
-        sys.exit(1)
-    index_url = urllib.parse.urljoin(
-        kibana_url, f"api/saved_objects/index-pattern/{index_name}"
-    )
+    client = kibana.get_client(kibana_url)
+    client.ensure_ready()
+    index_url = f"api/saved_objects/index-pattern/{index_name}"
     # Check for existing index patterns, ask user to delete if found
-    if requests.get(index_url).status_code == 200:
+    if client.get(index_url).status_code == 200:
         if force:
             logger.debug(f"Deleting index pattern,'{index_name}' ...")
-            del_response = requests.delete(index_url, headers=headers)
+            del_response = client.delete(index_url)
             if del_response.status_code != 200:
                 logger.error(f"Unable to delete index pattern for '{index_name}'.")
                 logger.error(del_response)
@@ -209,7 +588,7 @@ def create_index_pattern(kibana_url, index_name, force=False):
                 logger.debug(f"{question} {value}")
                 if value == "y":
                     logger.info(f"Deleting index pattern,'{index_name}' ...")
-                    del_response = requests.delete(index_url, headers=headers)
+                    del_response = client.delete(index_url)
                     if del_response.status_code != 200:
                         logger.error(
                             f"Unable to delete index pattern for '{index_name}'."
@@ -225,7 +604,7 @@ def create_index_pattern(kibana_url, index_name, force=False):
                     return
     # API call to create index pattern
     logger.debug(f"Creating index pattern for '{index_name}'...")
-    response = requests.post(index_url, headers=headers, data=data)
+    response = client.post(index_url, json={"attributes": attributes})
     if response.status_code == 200:
         logger.debug(f"Successfully created index pattern for '{index_name}'!")
     else:
@@ -248,21 +627,9 @@ def convert_to_24_hour(time):
     :return: Time in HH:MM AM/PM format
     :rtype: str
     """
-    # 24 hour time regex
-    hh_mm = re.compile("^(0[0-9]|1[0-9]|2[0-3]):[0-5][0-9]$")
-    h_mm = re.compile("^([0-9]):[0-5][0-9]$")
-    # Declaring regex pattens
-    hh_mm_a = re.compile("^(1[0-2]|0[1-9]):[0-5][0-9] (AM|PM)$")
-    h_mm_a = re.compile("^([1-9]):[0-5][0-9] (AM|PM)$")
-    hh_a = re.compile("^(1[0-2]|0[1-9]) (AM|PM)$")
-    h_a = re.compile("^[1-9] (AM|PM)$")
-    if hh_mm_a.match(time) or h_mm_a.match(time):
-        return datetime.strftime(datetime.strptime(time, "%I:%M %p"), "%H:%M")
-    elif hh_a.match(time) or h_a.match(time):
-        return datetime.strftime(datetime.strptime(time, "%I %p"), "%H:%M")
-    elif hh_mm.match(time) or h_mm.match(time):
-        return datetime.strftime(datetime.strptime(time, "%H:%M"), "%H:%M")
-    else:
+    try:
+        return timeparse.to_24_hour(time)
+    except ValueError:
         logger.error(f"Unexpected format. Unable to convert '{time}'to 24 hour format.")
         sys.exit(1)
 
@@ -278,21 +645,9 @@ def convert_to_hhmm(time):
     :return: Time in HH:MM AM/PM format
     :rtype: str
     """
-    # Declaring regex pattens
-    hh_mm_a = re.compile("^(1[0-2]|0[1-9]):[0-5][0-9] (AM|PM)$")
-    h_mm_a = re.compile("^([1-9]):[0-5][0-9] (AM|PM)$")
-    hh_a = re.compile("^(1[0-2]|0[1-9]) (AM|PM)$")
-    h_a = re.compile("^[1-9] (AM|PM)$")
-    # 24 hour time regex
-    hh_mm = re.compile("^(0[0-9]|1[0-9]|2[0-3]):[0-5][0-9]$")
-    h_mm = re.compile("^([0-9]):[0-5][0-9]$")
-    if hh_mm_a.match(time) or h_mm_a.match(time):
-        return datetime.strftime(datetime.strptime(time, "%I:%M %p"), "%I:%M %p")
-    elif hh_a.match(time) or h_a.match(time):
-        return datetime.strftime(datetime.strptime(time, "%I %p"), "%I:%M %p")
-    elif hh_mm.match(time) or h_mm.match(time):
-        return datetime.strftime(datetime.strptime(time, "%H:%M"), "%I:%M %p")
-    else:
+    try:
+        return timeparse.to_12_hour(time)
+    except ValueError:
         logger.error(
             f"Unexpected format. Unable to convert '{time}'to HH:MM AM/PM format."
         )
@@ -312,7 +667,7 @@ def delete_file(path):
 
 def export_kibana(kibana_url, output, force=False):
     """
-    Export Kibana objects into ndjson by calling a cURL command.
+    Export Kibana objects into ndjson through the Kibana API.
 
     :param kibana_url: url to the Kibana instance
     :param output: full path of output file for ndjson
@@ -324,14 +679,10 @@ def export_kibana(kibana_url, output, force=False):
     """
     # Variables
     dashboard_ids = []
-    headers = {"kbn-xsrf": "true", "Content-Type": "application/json"}
     data = {"objects": [], "includeReferencesDeep": True}
-    export_url = urllib.parse.urljoin(kibana_url, "api/saved_objects/_export")
-    find_url = urllib.parse.urljoin(kibana_url, "api/saved_objects/_find")
     # Try to ping Kibana
-    if requests.get(kibana_url).status_code != 200:
-        logger.error(f"Unable to ping Kibana instance located at '{kibana_url}'")
-        sys.exit(1)
+    client = kibana.get_client(kibana_url)
+    client.ensure_ready()
 
     # If the file already exists, prompt user about deletion
     if os.path.isfile(output):
@@ -355,16 +706,15 @@ def export_kibana(kibana_url, output, force=False):
                 sys.exit(1)
     # Get all dashboard ids to export
     logger.info("Retrieving dashboards and related objects...")
-    dashboards = requests.get(find_url, params={"type": "dashboard"}).json()[
-        "saved_objects"
-    ]
+    dashboards = client.get(
+        "api/saved_objects/_find", params={"type": "dashboard"}
+    ).json()["saved_objects"]
     for dashboard in dashboards:
         dashboard_ids.append(dashboard["id"])
         data["objects"].append({"type": "dashboard", "id": dashboard["id"]})
-    data = str(data).replace("True", "true").replace("'", '"')
     # Exporting dashboards and related objects
     logger.info("Exporting Kibana dashboard and objects...")
-    response = requests.post(export_url, headers=headers, data=data)
+    response = client.post("api/saved_objects/_export", json=data)
     if response.status_code == 200:
         try:
             with open(output, "w") as file:
@@ -399,10 +749,9 @@ def get_last_id(bulk_api_path):
         logger.error(f"The path: '{bulk_api_path}' does not exist")
         sys.exit(1)
 
-    with open(bulk_api_path) as file:
-        lines = file.read().splitlines()
-        last_id = (json.loads(lines[-2]))["index"]["_id"]
-        return last_id
+    lines = get_last_lines(bulk_api_path, 2)
+    last_id = (json.loads(lines[-2]))["index"]["_id"]
+    return last_id
 
 
 def get_last_document(bulk_api_path):
@@ -421,10 +770,35 @@ def get_last_document(bulk_api_path):
         logger.erorr(f"The path: '{bulk_api_path}' does not exist")
         sys.exit()
 
-    with open(bulk_api_path) as file:
-        lines = file.read().splitlines()
-        last_document = json.loads(lines[-1])
-        return last_document
+    last_document = json.loads(get_last_lines(bulk_api_path, 1)[-1])
+    return last_document
+
+
+def get_last_lines(path, count):
+    """
+    Read the last lines of a file without loading the entire file.
+
+    : param path: Path to file
+    : param count: Number of lines to read
+    : type path: str
+    : type count: int
+    : return: The last lines of the file
+    : rtype: list of str
+    """
+    with open(path, "rb") as file:
+        file.seek(0, os.SEEK_END)
+        end = file.tell()
+        block = 1 << 16
+        data = b""
+        # Keep reading backwards until there is a full line before the last ones
+        while True:
+            start = max(0, end - block)
+            file.seek(start)
+            data = file.read(end - start)
+            lines = data.splitlines()
+            if start == 0 or len(lines) > count:
+                return [line.decode("utf-8") for line in lines[-count:]]
+            block *= 2
 
 
 def get_files(path, pattern, recursive=False):
@@ -481,13 +855,10 @@ def import_kibana(kibana_url, ndjson):
     """
     logger.info(f"Importing Kibana dashboard and objects from '{ndjson}'...")
     # Try to ping Kibana
-    if requests.get(kibana_url).status_code != 200:
-        logger.error(f"Unable to ping Kibana instance located at '{kibana_url}'")
-        sys.exit(1)
-    url = urllib.parse.urljoin(kibana_url, "api/saved_objects/_import")
-    headers = {"kbn-xsrf": "true"}
+    client = kibana.get_client(kibana_url)
+    client.ensure_ready()
     files = {"file": ("request.ndjson", load_file(ndjson))}
-    response = requests.post(url, headers=headers, files=files)
+    response = client.post("api/saved_objects/_import", files=files)
     if response.status_code == 200:
         logger.info("Successfully imported!")
     else:
@@ -496,6 +867,25 @@ def import_kibana(kibana_url, ndjson):
         sys.exit(1)
 
 
+def iter_bulk_json(path):
+    """
+    Read the documents of a bulk json one at a time.
+
+    : param path: Path to json in bulk api format
+    : type path: path
+    : return: generator of documents
+    : rtype: generator of dict
+    : raises Exception: JSON path does not exist
+    """
+    if not os.path.exists(path):
+        logger.error(f"The path: {path} does not exist")
+        sys.exit(1)
+    with open(path, "r") as file:
+        for line in file:
+            if '{"index":' not in line:
+                yield json.loads(line)
+
+
 def load_bulk_json(path):
     """
     Load build json as a dict.
@@ -506,16 +896,7 @@ def load_bulk_json(path):
     : rtype: dict
     : raises Exception: JSON path does not exist
     """
-    if not os.path.exists(path):
-        logger.error(f"The path: {path} does not exist")
-        sys.exit(1)
-    with open(path, "r") as file:
-        file_contents = file.read().splitlines()
-    new_contents = []
-    for line in file_contents:
-        if '{"index":' not in line:
-            new_contents.append(json.loads(line))
-    return new_contents
+    return list(iter_bulk_json(path))
 
 
 def load_json(path):
@@ -550,7 +931,7 @@ def load_yaml(path):
             logger.error(f"The path: {path} does not exist")
             sys.exit(1)
         with open(path, "r") as stream:
-            return yaml.safe_load(stream)
+            return yaml.load(stream, Loader=YamlLoader)  # nosec - safe loader
     except Exception as ex:
         logger.error(f"Unable to read climbing log, formatting error found {ex}")
         sys.exit(1)
@@ -577,6 +958,43 @@ def load_file(path):
         sys.exit(1)
 
 
+def read_bulk_actions(path):
+    """
+    Read the action and document lines of a bulk json without parsing them.
+
+    : param path: Path to json in bulk api format
+    : type path: str
+    : return: generator of action and document lines, the document is None for deletes
+    : rtype: generator of tuple
+    """
+    with open(path, "r") as file:
+        for line in file:
+            action = line.rstrip("\n")
+            if not action:
+                continue
+            if action.startswith('{"delete":'):
+                yield action, None
+            else:
+                yield action, next(file).rstrip("\n")
+
+
+def retarget_bulk_actions(actions, index_name):
+    """
+    Change the index of bulk actions, leaving the documents untouched.
+
+    : param actions: action and document lines
+    : param index_name: Name of index
+    : type actions: iterable of tuple
+    : type index_name: str
+    : return: generator of action and document lines
+    : rtype: generator of tuple
+    """
+    for action, document in actions:
+        metadata = json.loads(action)
+        next(iter(metadata.values()))["_index"] = index_name
+        yield json.dumps(metadata), document
+
+
 def send_email(
     sender, sender_pass, receiver, subject, template_dir, message, attachments=None
 ):
@@ -661,22 +1079,9 @@ def str_to_time(string):
     : return: datetime object
     : rtype: datetime
     """
-    # Declaring regex pattens
-    hh_mm_a = re.compile("^(1[0-2]|0[1-9]):[0-5][0-9] (AM|PM)$")
-    h_mm_a = re.compile("^([1-9]):[0-5][0-9] (AM|PM)$")
-    hh_a = re.compile("^(1[0-2]|0[1-9]) (AM|PM)$")
-    h_a = re.compile("^[1-9] (AM|PM)$")
-    # 24 hour time regex
-    hh_mm = re.compile("^(0[0-9]|1[0-9]|2[0-3]):[0-5][0-9]$")
-    h_mm = re.compile("^([0-9]):[0-5][0-9]$")
-    if hh_mm_a.match(string) or h_mm_a.match(string):
-        return datetime.strptime(string, "%I:%M %p")
-    elif hh_a.match(string) or h_a.match(string):
-        return datetime.strptime(string, "%I %p")
-    elif hh_mm.match(string) or h_mm.match(string):
-        return datetime.strptime(string, "%H:%M")
-    # TODO: Convert 24 hour format to 12 hour
-    else:
+    try:
+        return timeparse.to_datetime(string)
+    except ValueError:
         logger.error(
             f"Unexpected format. Unable to convert '{string}' to HH:MM AM/PM format."
         )
@@ -701,43 +1106,98 @@ def update_bulk_api(data, output_path, index_name):
         logger.info(f"'{output_path}' not found, creating file and writing...")
         write_bulk_api(data, output_path, index_name)
     elif data:
-        updated_list = []
-        current_index = get_last_id(output_path) + 1
-
         # If the data is a dict, then assume it's one object
         if type(data) is dict:
-            updated_list.append(
-                json.dumps({"index": {"_index": index_name, "_id": current_index}})
-            )
-            updated_list.append(json.dumps(data))
-            current_index += 1
+            data = [data]
         # If it's a list then, then assume it's multiple
-        elif type(data) is list:
-            for value in data:
-                updated_list.append(
-                    json.dumps({"index": {"_index": index_name, "_id": current_index}})
-                )
-                updated_list.append(json.dumps(value))
-                current_index += 1
-        else:
+        elif type(data) is not list:
             logger.error(
                 f"Object type '{type(data)} is not supported. Must be list or dict"
             )
             sys.exit(1)
         # Write to the JSON file
-        with open(output_path, "a") as file:
-            for line in updated_list:
-                file.write(line + "\n")
+        with BulkWriter(
+            output_path,
+            index_name,
+            start_id=get_last_id(output_path) + 1,
+            append=True,
+        ) as writer:
+            for value in data:
+                writer.write(value)
 
 
-def upload_to_es(es_url, path):
+def upload_chunk(es, chunk, max_chunk_bytes, max_retries, initial_backoff):
+    """
+    Upload a chunk of bulk actions into Elasticsearch.
+
+    Documents rejected because Elasticsearch is overloaded (429) are retried
+    with an exponential backoff.
+
+    : param es: ES Instance
+    : param chunk: action and document lines
+    : param max_chunk_bytes: maximum size of a request in bytes
+    : param max_retries: number of times to retry rejected documents
+    : param initial_backoff: seconds to wait before the first retry
+    : type es: obj
+    : type chunk: list of tuple
+    : type max_chunk_bytes: int
+    : type max_retries: int
+    : type initial_backoff: float
+    : return: results of the actions that failed
+    : rtype: list of dict
+    """
+    failed = []
+    for ok, item in helpers.streaming_bulk(
+        es,
+        chunk,
+        chunk_size=len(chunk),
+        max_chunk_bytes=max_chunk_bytes,
+        # Lines are already serialized, send them as is
+        expand_action_callback=lambda action: action,
+        raise_on_error=False,
+        max_retries=max_retries,
+        initial_backoff=initial_backoff,
+    ):
+        op_type, result = next(iter(item.items()))
+        # Deleting a document that doesn't exist is not an error
+        if not ok and not (op_type == "delete" and result.get("status") == 404):
+            failed.append(result)
+    return failed
+
+
+def upload_to_es(
+    es_url,
+    path,
+    chunk_size=glbs.ES_BULK_CHUNK_SIZE,
+    max_chunk_bytes=glbs.ES_BULK_CHUNK_BYTES,
+    thread_count=glbs.ES_BULK_THREADS,
+    max_retries=glbs.ES_BULK_MAX_RETRIES,
+    initial_backoff=glbs.ES_BULK_INITIAL_BACKOFF,
+    index_name=None,
+):
     """
     Upload bulk json files into Elasticsearch.
 
+    Files are streamed in chunks which are uploaded by a pool of threads,
+    instead of sending each file as a single request.
+
     : param es_url: url to Elasticsearch instance
     : param path: path to directory to import OR path to a specific file
+    : param chunk_size: maximum number of documents per request
+    : param max_chunk_bytes: maximum size of a request in bytes
+    : param thread_count: number of requests to send in parallel
+    : param max_retries: number of times to retry documents rejected with a 429
+    : param initial_backoff: seconds to wait before the first retry
+    : param index_name: Optional - upload into this index instead of the one in
+        the bulk json
     : type es_url: str
     : type path: str
+    : type chunk_size: int
+    : type max_chunk_bytes: int
+    : type thread_count: int
+    : type max_retries: int
+    : type initial_backoff: float
+    : type index_name: str
     : raises Exception: path is not a directory, does not exist
     """
     # Connecting to Elasticsearch
@@ -753,17 +1213,42 @@ def upload_to_es(es_url, path):
             sys.exit(1)
 
     for file in bulk_json:
-        content = load_file(file)
-        es_response = es.bulk(content)
+        failed = []
+        with ThreadPoolExecutor(max_workers=thread_count) as executor:
+            # Limit the number of chunks waiting to be uploaded
+            pending = set()
+            actions = read_bulk_actions(file)
+            if index_name:
+                actions = retarget_bulk_actions(actions, index_name)
+            for chunk in chunk_bulk_actions(actions, chunk_size, max_chunk_bytes):
+                if len(pending) >= thread_count * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        failed.extend(future.result())
+                pending.add(
+                    executor.submit(
+                        upload_chunk,
+                        es,
+                        chunk,
+                        max_chunk_bytes,
+                        max_retries,
+                        initial_backoff,
+                    )
+                )
+            for future in pending:
+                failed.extend(future.result())
         # If there are errors, look for problematic index and alert user
-        if es_response["errors"]:
+        if failed:
             es_error = ""
-            for item in es_response["items"]:
-                if item["index"]["status"] != 200:
-                    id = item["index"]["_id"]
-                    exception_type = item["index"]["error"]["type"]
-                    reason = item["index"]["error"]["reason"]
-                    es_error += f"  [id:{id}] {exception_type}: {reason} \n"
+            for result in failed:
+                id = result.get("_id")
+                if isinstance(result.get("error"), dict):
+                    exception_type = result["error"]["type"]
+                    reason = result["error"]["reason"]
+                else:
+                    exception_type = result.get("status")
+                    reason = result.get("error")
+                es_error += f"  [id:{id}] {exception_type}: {reason} \n"
             logger.error(
                 f"Unable to upload '{file}' into Elasticsearch do to"
                 f" the following rows:\n{es_error}"
@@ -772,43 +1257,98 @@ def upload_to_es(es_url, path):
         logger.debug(f"'{file}' has been successfully uploaded!")
 
 
+def wait_for_services(
+    es_url=None,
+    kibana_url=None,
+    timeout=glbs.SERVICE_TIMEOUT,
+    initial_delay=glbs.SERVICE_INITIAL_DELAY,
+    max_delay=glbs.SERVICE_MAX_DELAY,
+):
+    """
+    Wait for Elasticsearch and Kibana to be ready to use.
+
+    Elasticsearch is ready once the cluster is at least yellow, and Kibana once
+    its status API responds. Both are polled with an exponential backoff.
+
+    : param es_url: Optional - url to the Elasticsearch instance
+    : param kibana_url: Optional - url to the Kibana instance
+    : param timeout: seconds to wait before giving up
+    : param initial_delay: seconds to wait before the first retry
+    : param max_delay: maximum seconds to wait between retries
+    : type es_url: str
+    : type kibana_url: str
+    : type timeout: float
+    : type initial_delay: float
+    : type max_delay: float
+    : return: True if every service is ready, False if the timeout was reached
+    : rtype: bool
+    """
+    pending = {}
+    if es_url:
+        pending["Elasticsearch"] = (
+            urljoin(es_url, "_cluster/health"),
+            {"wait_for_status": "yellow", "timeout": "1s"},
+        )
+    if kibana_url:
+        pending["Kibana"] = (urljoin(kibana_url, "api/status"), {})
+    start = time.monotonic()
+    delay = initial_delay
+    while True:
+        for name, (url, params) in list(pending.items()):
+            try:
+                response = requests.get(url, params=params, timeout=5)
+                if response.status_code == 200:
+                    logger.debug(
+                        f"{name} is ready after {time.monotonic() - start:.2f}s"
+                    )
+                    del pending[name]
+            # Catching error if the service isn't up yet
+            except requests.exceptions.RequestException:
+                pass
+        if not pending:
+            return True
+        remaining = timeout - (time.monotonic() - start)
+        if remaining <= 0:
+            logger.warning(
+                f"{' and '.join(pending)} still not ready after {timeout} seconds"
+            )
+            return False
+        delay = min(delay, max_delay, remaining)
+        logger.info(
+            f"Waiting for {' and '.join(pending)} to be ready,"
+            f" trying again in {delay:.2f} seconds..."
+        )
+        time.sleep(delay)
+        delay *= 2
+
+
 def write_bulk_api(data, output_path, index_name):
     """
     Write data in bulk api format.
 
-    If the output path already exists, tge file will be overwritten.
+    Documents are streamed to disk, so data can be any iterable such as a generator.
+    If the output path already exists, the file will be replaced once every
+    document has been written.
 
     : param data: data to add write to json
     : param output_path: the path to the json in bulk api format
     : param index_name: Index name for elasticsearch
-    : type data: list of dict
+    : type data: dict or iterable of dict
     : type output_path: str
     : type index_name: str
     """
-    new_contents = []
-    current_index = 0
     # If the data is a dict, then assume it's one object
     if type(data) is dict:
-        new_contents.append(
-            json.dumps({"index": {"_index": index_name, "_id": current_index}})
-        )
-        new_contents.append(json.dumps(data))
-    # If it's a list then, then assume it's multiple
-    elif type(data) is list:
-        for row in data:
-            new_contents.append(
-                json.dumps({"index": {"_index": index_name, "_id": current_index}})
-            )
-            current_index += 1
-            new_contents.append(json.dumps(row))
-    else:
+        data = [data]
+    # Otherwise it must be a collection of objects
+    elif isinstance(data, (str, bytes)) or not hasattr(data, "__iter__"):
         logger.error(
-            f"Object type '{type(data)} is not supported. Must be list or dict"
+            f"Object type '{type(data)} is not supported. Must be iterable or dict"
         )
         sys.exit(1)
-    with open(output_path, "w") as file:
-        for line in new_contents:
-            file.write(line + "\n")
+    with BulkWriter(output_path, index_name) as writer:
+        for row in data:
+            writer.write(row)
 
 
 def write_json(data, output_path):
@@ -877,4 +1417,6 @@ def write_yaml(data, output_path, force=False):
                     )
                     sys.exit(1)
     with open(output_path, "w") as f:
-        data = yaml.safe_dump(data, f, sort_keys=False, default_flow_style=False)
+        data = yaml.dump(
+            data, f, Dumper=YamlDumper, sort_keys=False, default_flow_style=False
+        )
@@ -21,12 +21,16 @@ EMAIL_TEMPLATE_DIR = os.path.join(DATA_DIR, "email_templates")
 TEMPLATE_DIR = os.path.join(INPUT_DIR, "templates")
 SAMPLE_DATA_DIR = os.path.join(TEMPLATE_DIR, "sample_data")
 OUTPUT_DIR = os.path.join(DATA_DIR, "output")
+LOCATIONS_FILE = os.path.join(DATA_DIR, "locations.yaml")
+CACHE_DIR = os.path.join(DATA_DIR, "cache")
 TREND_DIR = os.path.join(DATA_DIR, "trend_analysis")
 IMAGE_DIR = os.path.join(BASE_DIR, "images")
 NOTEBOOK_DIR = os.path.join(IMAGE_DIR, "notebook")
 # Create directories not tracked by git
 if not os.path.exists(OUTPUT_DIR):
     os.mkdir(OUTPUT_DIR)
+if not os.path.exists(CACHE_DIR):
+    os.mkdir(CACHE_DIR)
 if not os.path.exists(LOG_DIR):
     os.mkdir(LOG_DIR)
 if not os.path.exists(CLI_LOG_DIR):
@@ -44,10 +48,48 @@ ES_URL_DOCKER = "http://host.docker.internal:9200"
 ES_DIR = os.path.join(DATA_DIR, "elasticsearch")
 ES_MAPPINGS = os.path.join(ES_DIR, "mappings")
 ES_INDEX_NAME = ["bookings", "sessions", "counters", "projects"]
+# Number of indices set up at once by 'init -f'
+INIT_THREADS = 4
 ES_BULK_DATA = os.path.join(ES_DIR, "bulk_data")
+# Client, the connection pool is shared by the threads uploading bulk files
+ES_MAX_CONNECTIONS = 10
+ES_TIMEOUT = 30
+ES_MAX_RETRIES = 3
+# Bulk uploads
+ES_BULK_CHUNK_SIZE = 500
+ES_BULK_CHUNK_BYTES = 10 * 1024 * 1024
+ES_BULK_THREADS = 4
+ES_BULK_MAX_RETRIES = 5
+ES_BULK_INITIAL_BACKOFF = 2
+# Generations of each index kept after a rebuild, including the live one
+ES_INDEX_GENERATIONS = 2
 # Kibana
 KIBANA_URL = "http://localhost:5601"
 KIBANA_URL_DOCKER = "http://host.docker.internal:5601"
+KIBANA_TIMEOUT = 30
+KIBANA_MAX_RETRIES = 5
+KIBANA_BACKOFF_FACTOR = 0.5
+# Waiting for Elasticsearch and Kibana to start
+SERVICE_TIMEOUT = 300
+SERVICE_INITIAL_DELAY = 0.25
+SERVICE_MAX_DELAY = 10
+SCRAPER_SERVICE_TIMEOUT = 60
+# Waiting for booking pages to be ready
+SCRAPER_PAGE_TIMEOUT = 30
+SCRAPER_POLL_INTERVAL = 0.25
+# Number of booking pages scraped at once
+SCRAPER_WORKERS = 4
+# Booking scraper daemon, longest sleep between checks of the schedule in seconds
+SCRAPER_SCHEDULE = os.path.join(WEB_SCRAPER_ENV_DIR, "schedule.yaml")
+SCRAPER_MAX_SLEEP = 60
+# Adaptive booking jobs, intervals between runs in minutes
+SCRAPER_MIN_INTERVAL = 10
+SCRAPER_MAX_INTERVAL = 60
+# Occupancy history used by adaptive jobs, and samples needed for an hour to count
+SCRAPER_HISTORY_WEEKS = 8
+SCRAPER_MIN_SAMPLES = 3
+# Reading booking pages without a browser
+SCRAPER_USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) climbr"
 # Weather data
 WEATHER_DIR = os.path.join(DATA_DIR, "weather")
 OTTAWA_WEATHER = os.path.join(WEATHER_DIR, "ottawa_weather.csv")
@@ -159,7 +201,6 @@ GYM_TEMPLATE = {
     "default": _default,
 }
 
-if config.default_gym:
-    default = config.default_gym.lower()
+default = config.default_gym.lower() if config.default_gym else None
 if isinstance(default, str) and default in GYM_TEMPLATE.keys():
     GYM_TEMPLATE.update({"default": GYM_TEMPLATE[default]})
@@ -0,0 +1,146 @@
+#!/usr/bin/python3
+"""This module contains a client for the Kibana REST API."""
+import sys
+import threading
+from urllib.parse import urljoin
+
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import common.globals as glbs
+
+# Kibana clients shared by the whole process, keyed by url
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+class KibanaClient:
+    """
+    A client for the Kibana REST API, sharing a pool of keep-alive connections.
+
+    Idempotent requests (ie. GET, DELETE) are retried with exponential backoff
+    when Kibana responds with 429 or 5xx, which is common while Kibana is starting
+    up. POST requests aren't retried, a retried create could fail with 409 or
+    create duplicates.
+
+    :param url: url to the Kibana instance
+    :param max_retries: number of times to retry a request
+    :param backoff_factor: seconds to wait before the first retry, doubled after
+    :param timeout: seconds to wait for a response
+    :type url: str
+    :type max_retries: int
+    :type backoff_factor: float
+    :type timeout: float
+    """
+
+    def __init__(
+        self,
+        url,
+        max_retries=glbs.KIBANA_MAX_RETRIES,
+        backoff_factor=glbs.KIBANA_BACKOFF_FACTOR,
+        timeout=glbs.KIBANA_TIMEOUT,
+    ):
+        """Create a Kibana client, without connecting to Kibana."""
+        self.url = url
+        self.timeout = timeout
+        self.ready = False
+        # Only urllib3's default idempotent methods are retried
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=[429, 500, 502, 503, 504],
+            raise_on_status=False,
+        )
+        self.session = requests.Session()
+        self.session.headers.update({"kbn-xsrf": "true"})
+        self.session.mount("http://", HTTPAdapter(max_retries=retry))
+        self.session.mount("https://", HTTPAdapter(max_retries=retry))
+
+    def request(self, method, path, **kwargs):
+        """
+        Send a request to the Kibana API.
+
+        :param method: HTTP method (ie. GET)
+        :param path: path relative to the Kibana url (ie. api/status)
+        :param kwargs: arguments passed on to requests
+        :type method: str
+        :type path: str
+        :return: response
+        :rtype: requests.Response
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, urljoin(self.url, path), **kwargs)
+
+    def get(self, path, **kwargs):
+        """
+        Send a GET request to the Kibana API.
+
+        :param path: path relative to the Kibana url
+        :type path: str
+        :return: response
+        :rtype: requests.Response
+        """
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        """
+        Send a POST request to the Kibana API.
+
+        :param path: path relative to the Kibana url
+        :type path: str
+        :return: response
+        :rtype: requests.Response
+        """
+        return self.request("POST", path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        """
+        Send a DELETE request to the Kibana API.
+
+        :param path: path relative to the Kibana url
+        :type path: str
+        :return: response
+        :rtype: requests.Response
+        """
+        return self.request("DELETE", path, **kwargs)
+
+    def is_ready(self):
+        """
+        Check if Kibana is available, the result is cached once it is.
+
+        :return: True if Kibana is available
+        :rtype: bool
+        """
+        if not self.ready:
+            try:
+                self.ready = self.get("api/status").status_code == 200
+            except requests.exceptions.RequestException:
+                self.ready = False
+        return self.ready
+
+    def ensure_ready(self):
+        """
+        Exit if Kibana isn't available.
+
+        :raises Exception: Unable to ping Kibana instance
+        """
+        if not self.is_ready():
+            logger.error(f"Unable to ping Kibana instance located at '{self.url}'")
+            sys.exit(1)
+
+
+def get_client(kibana_url):
+    """
+    Return the Kibana client shared by the whole process for a url.
+
+    :param kibana_url: url to the Kibana instance
+    :type kibana_url: str
+    :return: Kibana client
+    :rtype: KibanaClient
+    """
+    with _CLIENTS_LOCK:
+        if kibana_url not in _CLIENTS:
+            _CLIENTS[kibana_url] = KibanaClient(kibana_url)
+        return _CLIENTS[kibana_url]
@@ -0,0 +1,239 @@
+#!/usr/bin/python3
+"""This module contains the manifest used to incrementally process climbing logs."""
+
+import hashlib
+import json
+import os
+
+from loguru import logger
+
+import common.globals as glbs
+
+# Bump whenever the format of the cached documents changes
+MANIFEST_VERSION = 3
+
+
+def hash_file(path):
+    """
+    Return the sha1 digest of a file's contents.
+
+    :param path: path to file
+    :type path: str
+    :return: hex digest of the file
+    :rtype: str
+    """
+    sha1 = hashlib.sha1()  # nosec - used for change detection, not security
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 16), b""):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+class Manifest:
+    """
+    A persisted record of the climbing logs that have already been parsed.
+
+    Every log is tracked by its size, modification time and content hash, along
+    with the documents that were generated from it. Logs that have not changed
+    since the last run reuse their cached documents instead of being parsed again.
+
+    :param directory: directory used to store the manifest and cached documents
+    :param rebuild: ignore the existing manifest and parse every log again
+    :param fingerprint: Optional - hash of inputs shared by every log (ie. the
+        locations file), every log is parsed again when it changes
+    :param options: Optional - options used to generate documents from cached
+        logs, documents are generated again when they change
+    :type directory: str
+    :type rebuild: bool
+    :type fingerprint: str
+    :type options: dict
+    """
+
+    def __init__(self, directory, rebuild=False, fingerprint=None, options=None):
+        """Load an existing manifest, or start an empty one."""
+        self.directory = directory
+        self.path = os.path.join(directory, "manifest.json")
+        self.documents_path = os.path.join(directory, "documents.json")
+        self.records_dir = os.path.join(directory, "records")
+        self.rebuild = rebuild
+        self.fingerprint = fingerprint
+        self.options = options or {}
+        self.options_changed = False
+        self.logs = {}
+        self.stale = {}
+        self.removed = []
+        self.dirty = False
+        if not os.path.exists(self.records_dir):
+            os.makedirs(self.records_dir)
+        if os.path.isfile(self.path) and not rebuild:
+            try:
+                with open(self.path, "r") as file:
+                    content = json.load(file)
+                if content.get("version") != MANIFEST_VERSION:
+                    logger.debug("Outdated manifest found, rebuilding cache...")
+                elif content.get("fingerprint") != fingerprint:
+                    logger.debug("Shared inputs have changed, rebuilding cache...")
+                else:
+                    self.logs = content["logs"]
+                    self.options_changed = content.get("options", {}) != self.options
+                    self.dirty = self.options_changed
+            except (ValueError, KeyError):
+                logger.warning(f"Unable to read '{self.path}', rebuilding cache...")
+
+    def __key(self, path):
+        return os.path.relpath(path, glbs.BASE_DIR)
+
+    def __record_path(self, digest):
+        return os.path.join(self.records_dir, f"{digest}.json")
+
+    def refresh(self, paths):
+        """
+        Compare a list of logs against the manifest.
+
+        Files that match on size and modification time are trusted as is,
+        otherwise the contents are hashed to see if the log actually changed.
+
+        :param paths: paths to every climbing log
+        :type paths: list of str
+        :return: paths of logs that are new or have changed
+        :rtype: list of str
+        """
+        keys = set()
+        for path in paths:
+            key = self.__key(path)
+            keys.add(key)
+            stat = os.stat(path)
+            entry = self.logs.get(key)
+            if (
+                entry
+                and entry["size"] == stat.st_size
+                and entry["mtime"] == stat.st_mtime_ns
+            ):
+                continue
+            digest = hash_file(path)
+            if entry and entry["hash"] == digest:
+                # Touched but not modified, only the stats need to be updated
+                entry.update({"size": stat.st_size, "mtime": stat.st_mtime_ns})
+                self.dirty = True
+            else:
+                self.stale[key] = {
+                    "size": stat.st_size,
+                    "mtime": stat.st_mtime_ns,
+                    "hash": digest,
+                }
+        self.removed = [key for key in self.logs if key not in keys]
+        return [path for path in paths if self.__key(path) in self.stale]
+
+    def get(self, path):
+        """
+        Return the cached documents of an unchanged log.
+
+        :param path: path to climbing log
+        :type path: str
+        :return: cached documents
+        :rtype: dict
+        """
+        entry = self.logs[self.__key(path)]
+        with open(self.__record_path(entry["hash"]), "r") as file:
+            return json.load(file)
+
+    def put(self, path, record):
+        """
+        Cache the documents generated from a new or changed log.
+
+        :param path: path to climbing log
+        :param record: documents generated from the log
+        :type path: str
+        :type record: dict
+        """
+        key = self.__key(path)
+        entry = self.stale.pop(key)
+        with open(self.__record_path(entry["hash"]), "w") as file:
+            json.dump(record, file)
+        # Keep the session date to order logs without loading their documents
+        entry["date"] = record["session"]["date"]
+        self.logs[key] = entry
+        self.dirty = True
+
+    def sort(self, paths):
+        """
+        Sort logs chronologically by the date and start time of their session.
+
+        Every log must already be in the manifest, logs that share the same
+        start are ordered by path.
+
+        :param paths: paths to climbing logs
+        :type paths: list of str
+        :return: sorted paths
+        :rtype: list of str
+        """
+        return sorted(
+            paths, key=lambda path: (self.logs[self.__key(path)]["date"], path)
+        )
+
+    def get_documents(self):
+        """
+        Return the content hash of every document uploaded by the last update.
+
+        :return: content hashes keyed by index and document id, and the
+            generation of every index they were uploaded to
+        :rtype: tuple of dict
+        """
+        if self.rebuild or not os.path.isfile(self.documents_path):
+            return {}, {}
+        try:
+            with open(self.documents_path, "r") as file:
+                content = json.load(file)
+            if content.get("version") == MANIFEST_VERSION:
+                return content["documents"], content.get("generations", {})
+        except (ValueError, KeyError):
+            logger.warning(f"Unable to read '{self.documents_path}'...")
+        return {}, {}
+
+    def set_documents(self, documents, generations):
+        """
+        Store the content hash of every uploaded document.
+
+        :param documents: content hashes keyed by index and document id
+        :param generations: generation of every index the documents are in
+        :type documents: dict of dict
+        :type generations: dict of str
+        """
+        tmp_path = f"{self.documents_path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "generations": generations,
+                    "documents": documents,
+                },
+                file,
+            )
+        os.replace(tmp_path, self.documents_path)
+
+    def save(self):
+        """Write the manifest to disk and remove documents that are no longer used."""
+        for key in self.removed:
+            del self.logs[key]
+        if not (self.dirty or self.removed):
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "fingerprint": self.fingerprint,
+                    "options": self.options,
+                    "logs": self.logs,
+                },
+                file,
+            )
+        os.replace(tmp_path, self.path)
+        # Clean up documents of logs that were removed or changed
+        in_use = {f"{entry['hash']}.json" for entry in self.logs.values()}
+        for file in os.listdir(self.records_dir):
+            if file not in in_use:
+                os.remove(os.path.join(self.records_dir, file))
+        self.removed = []
+        self.dirty = False
+        self.options_changed = False
@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+"""This module contains a schema validator for documents such as climbing logs."""
+
+
+class Field:
+    """
+    Description of a field in a document, used to build a validator.
+
+    :param types: Types the value can be, compared exactly so bool isn't an int
+    :param required: Whether the field must be present
+    :param required_if: Optional - Function of the whole document, the field is
+        required when it returns True
+    :param nullable: Whether the value can be None
+    :param fields: Optional - Fields of a dict value
+    :param items: Optional - Field describing every item of a list value
+    :param checks: Functions of the value and the whole document, returning an
+        error message, or None if the value is valid
+    :type types: type
+    :type required: bool
+    :type required_if: function
+    :type nullable: bool
+    :type fields: dict of Field
+    :type items: Field
+    :type checks: list of function
+    """
+
+    def __init__(
+        self,
+        *types,
+        required=False,
+        required_if=None,
+        nullable=False,
+        fields=None,
+        items=None,
+        checks=(),
+    ):
+        """Create a field description."""
+        self.types = frozenset(types)
+        self.required = required
+        self.required_if = required_if
+        self.nullable = nullable
+        self.fields = fields
+        self.items = items
+        self.checks = tuple(checks)
+
+
+def compile_schema(field):
+    """
+    Build a validator for documents described by a field.
+
+    The schema is resolved once into nested functions, so a document is checked
+    in a single pass that collects every error instead of stopping at the first.
+
+    :param field: Description of the document
+    :type field: Field
+    :return: Function of a document, returning a list of errors formatted as
+        'field.path: message'
+    :rtype: function
+    """
+    validate = _compile(field)
+
+    def validate_document(document):
+        errors = []
+        validate(document, "", errors, document)
+        return errors
+
+    return validate_document
+
+
+def _compile(field):
+    """
+    Resolve a field description into a function that validates a value.
+
+    :param field: Description of the value
+    :type field: Field
+    :return: Function of a value, its path, the list of errors and the document
+    :rtype: function
+    """
+    types = field.types
+    type_names = " or ".join(sorted(t.__name__ for t in types))
+    nullable = field.nullable
+    checks = field.checks
+    children = None
+    if field.fields is not None:
+        children = [
+            (name, child, _compile(child)) for name, child in field.fields.items()
+        ]
+    validate_item = _compile(field.items) if field.items is not None else None
+
+    def validate(value, path, errors, document):
+        if value is None and nullable:
+            return
+        if types and type(value) not in types:
+            errors.append(
+                f"{path or '(root)'}: expected {type_names},"
+                f" got {type(value).__name__}"
+            )
+            return
+        for check in checks:
+            message = check(value, document)
+            if message:
+                errors.append(f"{path or '(root)'}: {message}")
+        if children is not None:
+            for name, child, validate_child in children:
+                child_path = f"{path}.{name}" if path else name
+                if name in value:
+                    validate_child(value[name], child_path, errors, document)
+                elif child.required or (
+                    child.required_if is not None and child.required_if(document)
+                ):
+                    errors.append(f"{child_path}: missing required field")
+        if validate_item is not None:
+            for index, item in enumerate(value):
+                validate_item(item, f"{path}[{index}]", errors, document)
+
+    return validate
@@ -2,16 +2,23 @@
 """This module contains classes and functions that relate to climbing sessions."""
 
 import datetime
+import hashlib
+import json
+import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
 import pytz
+import yaml
 from loguru import logger
-from timezonefinder import TimezoneFinder
 
 import common.common as common
 import common.constants as constants
-import common.validate as validate
+import common.globals as glbs
+import common.schema as schema
+import common.timeparse as timeparse
+from common.schema import Field
 
 # Classes
 
@@ -34,6 +41,18 @@ class Counter:
     :type onsight: int
     """
 
+    # Sessions hold a counter for every grade, slots keep them compact
+    __slots__ = (
+        "grade",
+        "onsight",
+        "flash",
+        "redpoint",
+        "repeat",
+        "attempts",
+        "completed",
+        "total",
+    )
+
     def __init__(self, grade, flash, redpoint, repeat, attempts, onsight=None):
         """Create counter object."""
         # TODO: Move validation of counters here
@@ -88,6 +107,23 @@ class Project(Counter):
     :type media: list of str
     """
 
+    __slots__ = (
+        "name",
+        "location",
+        "style",
+        "notes",
+        "media",
+        "is_last",
+        "reset",
+        "cumulative_onsight",
+        "cumulative_flash",
+        "cumulative_redpoint",
+        "cumulative_repeat",
+        "cumulative_attempts",
+        "cumulative_completed",
+        "cumulative_total",
+    )
+
     def __init__(
         self,
         grade,
@@ -123,6 +159,32 @@ class Project(Counter):
         self.cumulative_completed = self.completed
         self.cumulative_total = self.total
 
+    @classmethod
+    def fromDict(cls, project_dict):
+        """
+        Create a project object from a dictionary returned by toDict.
+
+        :param project_dict: Project dictionary
+        :type project_dict: dict
+        :return: Project object
+        :rtype: Project
+        """
+        return cls(
+            project_dict["grade"],
+            project_dict["flash"],
+            project_dict["redpoint"],
+            project_dict["repeat"],
+            project_dict["attempts"],
+            project_dict["name"],
+            project_dict["location"],
+            project_dict["style"],
+            project_dict["notes"],
+            project_dict["media"],
+            project_dict["is_last"],
+            onsight=project_dict.get("onsight"),
+            reset=project_dict["reset"],
+        )
+
     def set_is_last(self, is_last):
         """
         Assign new value for is_last.
@@ -246,15 +308,48 @@ class Location:
     :param lon: Longitude
     :param grading: A list of the grading scale used
     :param is_outdoor: The style of climbing, indoor/ outdoor
+    :param timezone: Optional - Name of the timezone (ie. America/Toronto),
+        looked up from the coordinates if not given
+    :param aliases: Optional - Other names used to refer to the location
+    :param has_kids_grades: Whether kids problems are tracked separately
+    :param city: Optional - City of the location
+    :param province: Optional - Province or state of the location
+    :param country: Optional - Country of the location
+    :param postal: Optional - Postal code of the location
+    :param capacity: Optional - Capacity of the gym
     :type name: str
     :type address: str
     :type lat: float
     :type lon: float
     :type grading: list
     :type is_outdoor: bool
+    :type timezone: str
+    :type aliases: list of str
+    :type has_kids_grades: bool
+    :type city: str
+    :type province: str
+    :type country: str
+    :type postal: str
+    :type capacity: int
     """
 
-    def __init__(self, name, address, lat, lon, grading, is_outdoor):
+    def __init__(
+        self,
+        name,
+        address,
+        lat,
+        lon,
+        grading,
+        is_outdoor,
+        timezone=None,
+        aliases=None,
+        has_kids_grades=False,
+        city=None,
+        province=None,
+        country=None,
+        postal=None,
+        capacity=None,
+    ):
         """Create a climbing location object."""
         self.name = name
         self.address = address
@@ -262,6 +357,120 @@ class Location:
         self.lon = lon
         self.grading = grading
         self.is_outdoor = is_outdoor
+        self.timezone_name = timezone
+        self.aliases = aliases or []
+        self.has_kids_grades = has_kids_grades
+        self.city = city
+        self.province = province
+        self.country = country
+        self.postal = postal
+        self.capacity = capacity
+        self.__timezone = None
+
+    @property
+    def timezone(self):
+        """
+        Return the timezone of the location, resolving it once on first use.
+
+        :return: timezone
+        :rtype: pytz.timezone
+        """
+        if self.__timezone is None:
+            if not self.timezone_name:
+                self.timezone_name = get_timezone(self.lat, self.lon)
+            self.__timezone = pytz.timezone(self.timezone_name)
+        return self.__timezone
+
+
+class LocationRegistry:
+    """
+    An index of climbing locations by name and alias.
+
+    :param locations: Climbing locations, in the order they should be listed
+    :type locations: list of Location
+    """
+
+    def __init__(self, locations):
+        """Index climbing locations by their name and aliases."""
+        self.locations = list(locations)
+        self.__by_name = {}
+        for location in self.locations:
+            for key in [location.name, *location.aliases]:
+                key = key.lower()
+                if self.__by_name.get(key, location) is not location:
+                    logger.error(
+                        f"'{key}' is used by both '{self.__by_name[key].name}'"
+                        f" and '{location.name}'"
+                    )
+                    sys.exit(1)
+                self.__by_name[key] = location
+
+    @classmethod
+    def fromFile(cls, path):
+        """
+        Load climbing locations from a yaml or json file.
+
+        Grading scales can be listed inline, or referenced by name from the
+        file's 'grading_scales' or from common/constants.py (ie. V_SCALE).
+
+        :param path: Path to the locations file
+        :type path: str
+        :return: Location registry
+        :rtype: LocationRegistry
+        """
+        if not os.path.isfile(path):
+            logger.error(f"The path: {path} does not exist")
+            sys.exit(1)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                if path.endswith(".json"):
+                    content = json.load(file)
+                else:
+                    content = yaml.load(file, Loader=common.YamlLoader)  # nosec
+            scales = content.get("grading_scales", {})
+            locations = []
+            for info in content["locations"]:
+                info = dict(info)
+                grading = info.pop("grading")
+                if isinstance(grading, str):
+                    grading = scales.get(grading, getattr(constants, grading, None))
+                    if grading is None:
+                        raise ValueError(f"unknown grading scale for '{info['name']}'")
+                locations.append(Location(grading=grading, **info))
+        except (ValueError, KeyError, TypeError, yaml.YAMLError) as ex:
+            logger.error(f"Unable to read locations from '{path}', {ex}")
+            sys.exit(1)
+        return cls(locations)
+
+    def __iter__(self):
+        """Iterate over the climbing locations."""
+        return iter(self.locations)
+
+    def __contains__(self, name):
+        """Check if a name or alias belongs to a climbing location."""
+        return self.get(name) is not None
+
+    def get(self, name):
+        """
+        Return the climbing location with a name or alias, ignoring case.
+
+        :param name: name or alias of location
+        :type name: str
+        :return: location information
+        :rtype: Location or None
+        """
+        if not isinstance(name, str):
+            return None
+        return self.__by_name.get(name.lower())
+
+    def names(self):
+        """
+        Retrieve a list of location names.
+
+        :return: location names
+        :rtype: list of str
+        """
+        return [location.name for location in self.locations]
 
 
 class Session:
@@ -269,14 +478,66 @@ class Session:
     A climbing session object that contains information from user logs.
 
     :param session_log: A YAML path containing information on a climbing session
-    :type: str
+    :param content: Optional - contents of the log, already validated
+    :type session_log: str
+    :type content: dict
     """
 
-    def __init__(self, session_log):
+    # Stats of kids/ adult problems and onsights are only set for the locations
+    # that track them, unused slots don't take up space like a __dict__ would
+    __slots__ = (
+        "climbers",
+        "coordinates",
+        "date",
+        "description",
+        "duration",
+        "end_time",
+        "end_hour",
+        "end_minute",
+        "injury",
+        "location_name",
+        "media",
+        "shoes",
+        "start_time",
+        "start_hour",
+        "start_minute",
+        "style",
+        "month",
+        "day",
+        "day_of_week",
+        "year",
+        "Location",
+        "Projects",
+        "Counters",
+        "onsight",
+        "flash",
+        "redpoint",
+        "repeat",
+        "attempts",
+        "completed",
+        "total_problems",
+        "onsight_kids",
+        "flash_kids",
+        "redpoint_kids",
+        "repeat_kids",
+        "attempts_kids",
+        "completed_kids",
+        "total_problems_kids",
+        "onsight_adult",
+        "flash_adult",
+        "redpoint_adult",
+        "repeat_adult",
+        "attempts_adult",
+        "completed_adult",
+        "total_problems_adult",
+    )
+
+    def __init__(self, session_log, content=None):
         """Create initial climbing session object."""
         # Validate, normalize and add additional information to session log data
-        validated = self.__is_valid(common.load_yaml(session_log))
-        normalized = self.__normalize(validated)
+        if content is None:
+            content = self.__is_valid(common.load_yaml(session_log), session_log)
+        normalized = self.__normalize(content)
         session_info = self.__enchance(normalized)
         # Class variables
         self.climbers = session_info["climbers"]
@@ -315,7 +576,7 @@ class Session:
             self.onsight = session_info["onsight"]
         # If the session location is at Altitude Kanata,
         # then track kids VS adult problems
-        if self.Location.lat == 45.297970 and self.Location.lon == -75.911150:
+        if self.Location.has_kids_grades:
             self.flash_kids = session_info["flash_kids"]
             self.redpoint_kids = session_info["redpoint_kids"]
             self.repeat_kids = session_info["repeat_kids"]
@@ -333,190 +594,23 @@ class Session:
                 self.onsight_kids = session_info["onsight_kids"]
                 self.onsight_adult = session_info["onsight_adult"]
 
-    def __is_valid(self, session_log):
+    def __is_valid(self, session_log, path):
         """
         Validate if a session_log has all minimal required fields.
 
-        Returning the session object if valid/
+        Returning the session object if valid.
 
         :param session_log: contains a dict of session information and stats
+        :param path: path to the climbing log, used to report errors
         :type session_log: dict
+        :type path: str
         :raises Exception: Climbing session does not meet minimal required fields
         :return: session
         :rtype: dict
         """
-        # Required fields
-        session_keys = session_log.keys()
-        required = {
-            "location": "location" in session_keys,
-            "style": "style" in session_keys,
-            "date": "date" in session_keys,
-            "time": "time" in session_keys,
-            "start_time": "time" in session_keys
-            and "start" in session_log["time"].keys(),
-            "end_time": "time" in session_keys and "end" in session_log["time"].keys(),
-        }
-        missing = []
-        # If not all values are present, then raise an error
-        if not (all(list(required.values()))):
-            for item in required:
-                if not required[item]:
-                    missing.append(item)
-            logger.error(f"Unable to find required values: {missing}")
-            sys.exit(1)
-
-        # Basic field type validation
-        valid_location = type(session_log["location"]) == str
-        valid_style = type(session_log["style"]) == str
-        valid_description = (
-            type(session_log["description"]) == str
-            if "description" in session_keys
-            else True
-        )
-        valid_date = True
-        if type(session_log["date"]) == datetime.date:
-            try:
-                validate.date(str(session_log["date"]))
-            except Exception:
-                valid_date = False
-                pass
-        else:
-            valid_date = False
-        valid_time = type(session_log["time"]) == dict
-        valid_start_time = type(session_log["time"]["start"]) == str
-        valid_end_time = type(session_log["time"]["end"]) == str
-        # Validating climbers field if it exists, and it's children fields
-        valid_climbers = True
-        if "climbers" in session_keys and type(session_log["climbers"]) == list:
-            for climber in session_log["climbers"]:
-                if type(climber) != str:
-                    valid_climbers = False
-                    break
-        else:
-            valid_climbers = False
-        valid_climbers = (
-            type(session_log["climbers"]) == list
-            if "climbers" in session_keys
-            else True
-        )
-        valid_injury = True
-        if "injury" in session_keys:
-            if type(session_log["injury"]) == dict and set(
-                ["isTrue", "description"]
-            ).issubset(session_log["injury"].keys()):
-                if (
-                    type(session_log["injury"]["isTrue"]) != bool
-                    or type(session_log["injury"]["description"]) != str
-                ):
-                    valid_injury = False
-            else:
-                valid_injury = False
-        valid_media = True
-        if "media" in session_keys:
-            if type(session_log["media"]) == list:
-                for item in session_log["media"]:
-                    if type(item) != str:
-                        valid_media = False
-                        break
-            elif isinstance(session_log["media"], None):
-                pass
-            else:
-                valid_media = False
-        valid_counter = (
-            type(session_log["counter"]) == list if "counter" in session_keys else True
-        )
-        if "counter" in session_keys and valid_counter:
-            for counter in session_log["counter"]:
-                min_set = ["grade", "flash", "redpoint", "repeat", "attempts"]
-                if "outdoor" in session_log["style"]:
-                    min_set.append("onsight")
-                if set(min_set).issubset(counter.keys()):
-                    for item in min_set:
-                        if item == "grade" and type(counter[item]) != str:
-                            valid_counter = False
-                            break
-                        elif item != "grade" and type(counter[item]) != int:
-                            valid_counter = False
-                            break
-                else:
-                    valid_counter = False
-                    break
-        valid_projects = True
-        if "projects" in session_keys:
-            if type(session_log["projects"]) == list:
-                for climb in session_log["projects"]:
-                    min_set = [
-                        "name",
-                        "location",
-                        "style",
-                        "grade",
-                        "flash",
-                        "redpoint",
-                        "repeat",
-                        "attempts",
-                    ]
-                    if "outdoor" in session_log["style"]:
-                        min_set.append("onsight")
-                    if set(min_set).issubset(list(climb.keys())):
-                        climb_fields = [
-                            type(climb["name"]) == str,
-                            type(climb["location"]) == str,
-                            type(climb["style"]) == list,
-                            type(climb["grade"]) == str,
-                            type(climb["flash"]) == int and climb["flash"] in [0, 1],
-                            type(climb["redpoint"]) == int
-                            and climb["redpoint"] in [0, 1],
-                            type(climb["repeat"]) == int and climb["repeat"] >= 0,
-                            type(climb["attempts"]) == int and climb["attempts"] >= 0,
-                        ]
-                        # For projects, Flash, Redpoint and Onsighting
-                        # are mutually exclusive
-                        if climb["flash"] and climb["redpoint"]:
-                            climb_fields.append(False)
-                        if "onsight" in climb.keys():
-                            climb_fields.extend(
-                                [
-                                    type(climb["onsight"]) == int
-                                    and climb["onsight"] in [0, 1],
-                                    not (climb["flash"] and climb["onsight"]),
-                                    not (climb["redpoint"] and climb["onsight"]),
-                                ]
-                            )
-                        if not all(climb_fields):
-                            valid_projects = False
-                            break
-                    else:
-                        valid_projects = False
-                        break
-            else:
-                valid_projects = False
-        valid_shoes = (
-            isinstance(session_log["shoes"], str)
-            or isinstance(session_log["shoes"], list)
-            if "shoes" in session_keys
-            else True
-        )
-        valid_fields = {
-            "location": valid_location,
-            "style": valid_style,
-            "description": valid_description,
-            "date": valid_date,
-            "time": valid_time,
-            "start": valid_start_time,
-            "end": valid_end_time,
-            "climbers": valid_climbers,
-            "injury": valid_injury,
-            "media": valid_media,
-            "counter": valid_counter,
-            "projects": valid_projects,
-            "shoes": valid_shoes,
-        }
-        # If all fields are not valid, then raise an error with the offending fields
-        if not (all(list(valid_fields.values()))):
-            for field in valid_fields:
-                if not valid_fields[field]:
-                    missing.append(field)
-            logger.error(f"Invalid syntax for the following fields: {missing}")
+        errors = _SESSION_SCHEMA(session_log)
+        if errors:
+            logger.error(f"Invalid climbing log '{path}': {errors}")
             sys.exit(1)
         # If passes all validation, then just return the value
         return session_log
@@ -539,6 +633,8 @@ class Session:
                 f"Current supported locations include: {get_location_names()}"
             )
             sys.exit(1)
+        # Store the location under its full name if it was given by an alias
+        session_log["location"] = location.name
         # Split the style field by commas and turn it into a list instead
         # This is because style could be multiple fields
         style_list = session_log["style"].split(",")
@@ -593,9 +689,7 @@ class Session:
                     climb["media"] = None
         session_log["projects"] = reformat_projects(session_log["projects"])
         # Initializing Timezone info
-        tf = TimezoneFinder()
-        location = get_location(session_log["location"])
-        location_tz = pytz.timezone(tf.timezone_at(lng=location.lon, lat=location.lat))
+        location_tz = location.timezone
         # Add time zone to start and end times
         local_start = location_tz.normalize(
             location_tz.localize(
@@ -640,8 +734,8 @@ class Session:
         # Get/set lon and latitude
         location = get_location(session_log["location"])
         session_log["coordinates"] = [location.lon, location.lat]
-        # Boolean variable to add extra stats for Altitude Kanata
-        altitude_kanata = location.lat == 45.297970 and location.lon == -75.911150
+        # Boolean variable to add extra stats for gyms with kids problems
+        has_kids_grades = location.has_kids_grades
         # Iterate through counters and create total counter
         for name in [
             "onsight",
@@ -653,7 +747,7 @@ class Session:
             "total_problems",
         ]:
             session_log.update({name: 0})
-            if altitude_kanata:
+            if has_kids_grades:
                 session_log.update({name + "_kids": 0})
                 session_log.update({name + "_adult": 0})
         for counter_obj in session_log["counter"]:
@@ -665,7 +759,7 @@ class Session:
             session_log["completed"] += counter_obj.completed
             session_log["total_problems"] += counter_obj.total
             # Add more fields if it's
-            if altitude_kanata:
+            if has_kids_grades:
 
                 if "Kids" in counter_obj.grade:
                     session_log["onsight_kids"] += (
@@ -725,7 +819,7 @@ class Session:
         }
         if self.Location.is_outdoor:
             session_dict["onsight"] = self.onsight
-        if self.Location.lat == 45.297970 and self.Location.lon == -75.911150:
+        if self.Location.has_kids_grades:
             session_dict["flash_kids"] = self.flash_kids
             session_dict["redpoint_kids"] = self.redpoint_kids
             session_dict["repeat_kids"] = self.repeat_kids
@@ -780,10 +874,14 @@ class Session:
         :rtype: list of dict
         """
         counters = []
+        # Position of each grade in the location's scale, so dashboards can order
+        # grades and fill in the ones that weren't climbed
+        grade_indexes = {grade: i for i, grade in enumerate(self.Location.grading)}
         for session_counter in self.Counters:
             counter_dict = session_counter.toDict()
             counter_dict.update(
                 {
+                    "grade_index": grade_indexes.get(session_counter.grade),
                     "session": {
                         "location": self.location_name,
                         "style": self.style,
@@ -793,7 +891,7 @@ class Session:
                         "day": self.day,
                         "year": self.year,
                         "shoes": self.shoes,
-                    }
+                    },
                 }
             )
             counters.append(counter_dict)
@@ -801,168 +899,35 @@ class Session:
 
 
 # Variables
-_ALTITUDE_SCALE = [
-    "VB/V0",
-    "V0/V1",
-    "V1/V2",
-    "V2/V3",
-    "V3/V4",
-    "V4/V5",
-    "V5/V6",
-    "V6/V7",
-    "V7/V8",
-    "V8/V9",
-    "V9+",
-    "Kids - VB/V0",
-    "Kids - V0/V1",
-    "Kids - V1/V2",
-    "Kids - V2/V3",
-    "Kids - V3/V4",
-    "Kids - V4/V5",
-    "Kids - V5/V6",
-    "Kids - V6/V7",
-    "Kids - V7/V8",
-    "Kids - V8/V9",
-    "Kids - V9+",
-    "competition",
-    "routesetting-squad",
-]
-_LOCATIONS = [
-    Location(
-        "Altitude Kanata",
-        "0E5, 501 Palladium Dr, Kanata, ON K2V 0E5",
-        45.297970,
-        -75.911150,
-        _ALTITUDE_SCALE,
-        False,
-    ),
-    Location(
-        "Altitude Gatineau",
-        "35 Boulevard Saint-Raymond, Gatineau, QC J8Y 1R5",
-        45.446861,
-        -75.736801,
-        _ALTITUDE_SCALE,
-        False,
-    ),
-    Location(
-        "Hog's Back Falls",
-        "Hog's Back Falls, Ottawa, ON",
-        45.3710517,
-        -75.698022,
-        constants.V_SCALE,
-        True,
-    ),
-    Location(
-        "Calabogie",
-        "Greater Madawaska, Ontario",
-        45.264209,
-        -76.813545,
-        constants.V_SCALE,
-        True,
-    ),
-    Location(
-        "Lac Beauchamp",
-        "Lac Beauchamp, Gatineau, QC",
-        45.490288,
-        -75.617274,
-        constants.V_SCALE,
-        True,
-    ),
-    Location(
-        "Coyote Rock Gym",
-        "1737B St Laurent Blvd, Ottawa, ON K1G 3V4",
-        45.406130,
-        -75.625500,
-        ["White", "Orange", "Red", "Blue", "Green", "Purple", "Black", "Ungraded"],
-        False,
-    ),
-    Location(
-        "Klimat Wakefield",
-        "911-A Chemin Riverside, Wakefield, QC J0X 3G0",
-        45.648430,
-        -75.927340,
-        constants.V_SCALE,
-        False,
-    ),
-    Location(
-        "Up the Bloc",
-        "1224 Dundas St E #28, Mississauga, ON L4Y 4A2",
-        43.6037512,
-        -79.5866032,
-        [
-            "White",
-            "Yellow",
-            "Orange",
-            "Green",
-            "Blue",
-            "Purple",
-            "Red",
-            "Black",
-            "Pink",
-        ],
-        False,
-    ),
-    Location(
-        "Cafe Bloc",
-        "1209-1211 St Laurent Blvd, Montreal, QC H2X 2S6",
-        45.5096931,
-        -73.5652951,
-        constants.V_SCALE,
-        False,
-    ),
-    Location(
-        "Bloc Shop Hochelaga",
-        "2985 St Catherine St E, Montreal, QC H1W 3Y8",
-        45.5341923,
-        -73.6355159,
-        constants.V_SCALE,
-        False,
-    ),
-    Location(
-        "Bloc Shop Chabanel",
-        "1370 Rue Chabanel O, Montréal, QC H4N 1H4",
-        45.531948,
-        -73.6599657,
-        constants.V_SCALE,
-        False,
-    ),
-    Location(
-        "Allez Up",
-        "1555 Rue Saint-Patrick, Montréal, QC H3K 2B7",
-        45.4868841,
-        -73.5632112,
-        [
-            "White",
-            "Yellow",
-            "Orange",
-            "Green",
-            "Blue",
-            "Purple",
-            "Red",
-            "Black",
-            "Pink",
-        ],
-        False,
-    ),
-]
+_REGISTRY = None
 # Functions
 
 
+def get_document_id(*keys):
+    """
+    Return a stable document id derived from natural keys.
+
+    :param keys: values that uniquely identify a document
+    :type keys: str
+    :return: document id
+    :rtype: str
+    """
+    # Not used for security, only to keep ids short and stable across updates
+    return hashlib.sha1("\x1f".join(keys).encode("utf-8")).hexdigest()  # nosec
+
+
 def get_location(name):
     """
-    Return location object based on a name parameter.
+    Return location object based on a name or alias.
 
     If no location is found, return None.
 
-    :param name: name of location
+    :param name: name or alias of location
     :type name: str
     :return: location information
     :rtype: Location or None
     """
-    for location in _LOCATIONS:
-        if name == location.name:
-            return location
-    return None
+    return get_locations().get(name)
 
 
 def get_location_names():
@@ -972,10 +937,230 @@ def get_location_names():
     :return: location names
     :rtype: list
     """
-    location_names = []
-    for location in _LOCATIONS:
-        location_names.append(location.name)
-    return location_names
+    return get_locations().names()
+
+
+def get_locations():
+    """
+    Return the registry of climbing locations, loading it on first use.
+
+    :return: location registry
+    :rtype: LocationRegistry
+    """
+    global _REGISTRY
+    if _REGISTRY is None:
+        _REGISTRY = LocationRegistry.fromFile(glbs.LOCATIONS_FILE)
+    return _REGISTRY
+
+
+def get_timezone(lat, lon):
+    """
+    Return the name of the timezone at a set of coordinates.
+
+    Lookups are cached on disk, timezonefinder is only loaded for new coordinates.
+
+    :param lat: Latitude
+    :param lon: Longitude
+    :type lat: float
+    :type lon: float
+    :return: timezone name (ie. America/Toronto)
+    :rtype: str
+    """
+    cache_path = os.path.join(glbs.CACHE_DIR, "timezones.json")
+    key = f"{lat},{lon}"
+    timezones = {}
+    if os.path.isfile(cache_path):
+        with open(cache_path, "r") as file:
+            timezones = json.load(file)
+    if key not in timezones:
+        # Loading timezone polygons is expensive, so only import when needed
+        from timezonefinder import TimezoneFinder
+
+        timezone = TimezoneFinder().timezone_at(lng=lon, lat=lat)
+        if not timezone:
+            logger.error(f"Unable to find a timezone for coordinates ({lat}, {lon})")
+            sys.exit(1)
+        timezones[key] = timezone
+        common.write_json(timezones, cache_path)
+    return timezones[key]
+
+
+def parse_session(session_log):
+    """
+    Validate a climbing log and return the documents generated from it.
+
+    The log is only loaded once, for both validating and parsing it. Projects
+    are returned as they appear in the log, running totals across sessions are
+    applied afterwards.
+
+    :param session_log: A YAML path containing information on a climbing session
+    :type session_log: str
+    :return: session, counter and project documents (None if the log is
+        invalid), and every error found
+    :rtype: tuple of dict and list of str
+    """
+    content, errors = _load_session(session_log)
+    if errors:
+        return None, errors
+    climbing_session = Session(session_log, content)
+    record = {
+        "session": climbing_session.toDict(),
+        "counters": climbing_session.getCounters(),
+        "projects": climbing_session.getProjects(),
+    }
+    return record, []
+
+
+def parse_sessions(session_logs, jobs=None):
+    """
+    Parse climbing logs, fanning out over a pool of processes.
+
+    Every log is independent, so they are parsed in parallel and returned
+    in the same order they were given.
+
+    :param session_logs: YAML paths containing information on climbing sessions
+    :param jobs: number of worker processes, defaults to the number of CPUs
+    :type session_logs: list of str
+    :type jobs: int
+    :return: generator of log paths, the documents generated from them and errors
+    :rtype: generator of tuple
+    """
+    for session_log, (record, errors) in _map_logs(parse_session, session_logs, jobs):
+        yield session_log, record, errors
+
+
+def validate_session(session_log):
+    """
+    Validate a climbing log without parsing it.
+
+    :param session_log: YAML path containing information on a climbing session
+    :type session_log: str
+    :return: every error found, formatted as 'field.path: message'
+    :rtype: list of str
+    """
+    return _load_session(session_log)[1]
+
+
+def validate_sessions(session_logs, jobs=None):
+    """
+    Validate climbing logs, fanning out over a pool of processes.
+
+    :param session_logs: YAML paths containing information on climbing sessions
+    :param jobs: number of worker processes, defaults to the number of CPUs
+    :type session_logs: list of str
+    :type jobs: int
+    :return: generator of log paths and their errors
+    :rtype: generator of tuple
+    """
+    yield from _map_logs(validate_session, session_logs, jobs)
+
+
+def _load_session(session_log):
+    """
+    Load a climbing log and check it against the schema.
+
+    :param session_log: YAML path containing information on a climbing session
+    :type session_log: str
+    :return: contents of the log, and every error found
+    :rtype: tuple of dict and list of str
+    """
+    try:
+        with open(session_log, "r") as file:
+            content = yaml.load(file, Loader=common.YamlLoader)  # nosec
+    except (OSError, yaml.YAMLError) as ex:
+        return None, [f"unable to read climbing log, {' '.join(str(ex).split())}"]
+    return content, _SESSION_SCHEMA(content)
+
+
+def _map_logs(function, session_logs, jobs=None):
+    """
+    Apply a function to every climbing log over a pool of processes.
+
+    :param function: module level function of a climbing log path
+    :param session_logs: YAML paths containing information on climbing sessions
+    :param jobs: number of worker processes, defaults to the number of CPUs
+    :type function: function
+    :type session_logs: list of str
+    :type jobs: int
+    :return: generator of log paths and results, in the order they were given
+    :rtype: generator of tuple
+    """
+    workers = min(jobs or os.cpu_count() or 1, len(session_logs))
+    if workers <= 1:
+        for session_log in session_logs:
+            yield session_log, function(session_log)
+        return
+    # Hand out logs in batches to reduce the overhead of inter-process calls
+    chunksize = max(1, len(session_logs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from zip(
+            session_logs,
+            executor.map(function, session_logs, chunksize=chunksize),
+        )
+
+
+def reduce_sessions(records, sparse_counters=False):
+    """
+    Combine the documents of many climbing sessions into a single stream.
+
+    Projects keep a running total across sessions, so records must be given in
+    chronological order. Each project is emitted once a later attempt supersedes
+    it, or once every session has been seen.
+
+    Every document is paired with an id derived from its session's date,
+    start time and location, plus the grade for counters and the name for projects.
+
+    :param records: documents generated by parse_session, in chronological order
+    :param sparse_counters: skip counters of grades that weren't climbed
+    :type records: iterable of dict
+    :type sparse_counters: bool
+    :return: generator of index names, document ids and documents
+    :rtype: generator of tuple
+    """
+    # Latest attempt of every project, along with its session information and id
+    project_list = {}
+    for record in records:
+        # The date of a session includes its start time
+        session_key = (record["session"]["date"], record["session"]["location"])
+        yield "sessions", get_document_id(*session_key), record["session"]
+        for counter in record["counters"]:
+            if sparse_counters and not counter["total"]:
+                continue
+            yield "counters", get_document_id(*session_key, counter["grade"]), counter
+        for project_dict in record["projects"]:
+            project = Project.fromDict(project_dict)
+            id = get_document_id(*session_key, project.name)
+            if project.name in project_list.keys():
+                previous, previous_session, previous_id = project_list[project.name]
+                updated_total = [
+                    x + y
+                    for x, y in zip(previous.get_counters(), project.get_counters())
+                ]
+                # Remove is_last from the previous project instance
+                # and assign the new value to the current project
+                previous.set_is_last(False)
+                project.set_is_last(True)
+                # Increase the running counters
+                # and update the project with the current running counter
+                project.set_total_counter(
+                    updated_total[0],
+                    updated_total[1],
+                    updated_total[3],
+                    updated_total[4],
+                    updated_total[5],
+                    updated_total[6],
+                )
+                # No later session can change the previous instance anymore
+                yield "projects", previous_id, dict(
+                    previous.toDict(), session=previous_session
+                )
+            # If the project isn't in the running list, add it.
+            # Total counter is default the same as counter
+            else:
+                project.set_is_last(True)
+            project_list[project.name] = (project, project_dict["session"], id)
+    for project, session, id in project_list.values():
+        yield "projects", id, dict(project.toDict(), session=session)
 
 
 def reformat_counter(counters):
@@ -1046,3 +1231,107 @@ def reformat_projects(projects):
             )
         )
     return reformatted
+
+
+# Schema of climbing logs
+def _is_outdoor(session_log):
+    return (
+        isinstance(session_log.get("style"), str) and "outdoor" in session_log["style"]
+    )
+
+
+def _known_location(value, session_log):
+    if get_location(value) is None:
+        return (
+            f"unknown location '{value}', supported locations include:"
+            f" {get_location_names()}"
+        )
+
+
+def _valid_time(value, session_log):
+    try:
+        timeparse.parse_time(value)
+    except ValueError:
+        return f"unexpected time format '{value}', expecting HH:MM AM/PM or HH:MM"
+
+
+def _binary(value, session_log):
+    if value not in [0, 1]:
+        return f"expected 0 or 1, got {value}"
+
+
+def _not_negative(value, session_log):
+    if value < 0:
+        return f"expected a number of at least 0, got {value}"
+
+
+def _exclusive_sends(climb, session_log):
+    # For projects, Flash, Redpoint and Onsighting are mutually exclusive
+    sends = [key for key in ["flash", "redpoint", "onsight"] if climb.get(key)]
+    if len(sends) > 1:
+        return f"{' and '.join(sends)} are mutually exclusive"
+
+
+_SESSION_SCHEMA = schema.compile_schema(
+    Field(
+        dict,
+        fields={
+            "location": Field(str, required=True, checks=[_known_location]),
+            "style": Field(str, required=True),
+            "description": Field(str),
+            "date": Field(datetime.date, required=True),
+            "time": Field(
+                dict,
+                required=True,
+                fields={
+                    "start": Field(str, required=True, checks=[_valid_time]),
+                    "end": Field(str, required=True, checks=[_valid_time]),
+                },
+            ),
+            "climbers": Field(list),
+            "injury": Field(
+                dict,
+                fields={
+                    "isTrue": Field(bool, required=True),
+                    "description": Field(str, required=True),
+                },
+            ),
+            "media": Field(list, nullable=True, items=Field(str)),
+            "counter": Field(
+                list,
+                items=Field(
+                    dict,
+                    fields={
+                        "grade": Field(str, required=True),
+                        "onsight": Field(int, required_if=_is_outdoor),
+                        "flash": Field(int, required=True),
+                        "redpoint": Field(int, required=True),
+                        "repeat": Field(int, required=True),
+                        "attempts": Field(int, required=True),
+                    },
+                ),
+            ),
+            "projects": Field(
+                list,
+                items=Field(
+                    dict,
+                    checks=[_exclusive_sends],
+                    fields={
+                        "name": Field(str, required=True),
+                        "location": Field(str, required=True),
+                        "style": Field(list, required=True),
+                        "grade": Field(str, required=True),
+                        "onsight": Field(
+                            int, required_if=_is_outdoor, checks=[_binary]
+                        ),
+                        "flash": Field(int, required=True, checks=[_binary]),
+                        "redpoint": Field(int, required=True, checks=[_binary]),
+                        "repeat": Field(int, required=True, checks=[_not_negative]),
+                        "attempts": Field(int, required=True, checks=[_not_negative]),
+                    },
+                ),
+            ),
+            "shoes": Field(str, list),
+        },
+    )
+)
@@ -0,0 +1,222 @@
+#!/usr/bin/python3
+"""This module contains climbing stats computed locally, without Elasticsearch."""
+import json
+
+import numpy as np
+import pandas as pd
+
+# Columns taken from session and counter documents
+_SESSION_COLUMNS = (
+    "location",
+    "date",
+    "duration",
+    "flash",
+    "redpoint",
+    "repeat",
+    "attempts",
+    "completed",
+    "total_problems",
+)
+_COUNTER_COLUMNS = (
+    "grade",
+    "grade_index",
+    "flash",
+    "redpoint",
+    "repeat",
+    "attempts",
+    "completed",
+    "total",
+)
+_SENDS = ["flash", "redpoint", "repeat", "completed", "attempts"]
+
+
+def build_frames(records, location=None):
+    """
+    Build data frames of sessions and counters from parsed climbing logs.
+
+    Documents are gathered column by column, so every stat is computed with
+    vectorized operations over whole columns.
+
+    :param records: documents generated by parse_session
+    :param location: Optional - only include sessions at this location
+    :type records: iterable of dict
+    :type location: str
+    :return: sessions and counters data frames
+    :rtype: tuple of pandas.DataFrame
+    """
+    sessions = {column: [] for column in _SESSION_COLUMNS}
+    counters = {column: [] for column in _COUNTER_COLUMNS + ("location", "date")}
+    for record in records:
+        session = record["session"]
+        if location and session["location"] != location:
+            continue
+        for column in _SESSION_COLUMNS:
+            sessions[column].append(session[column])
+        for counter in record["counters"]:
+            if not counter["total"]:
+                continue
+            for column in _COUNTER_COLUMNS:
+                counters[column].append(counter[column])
+            counters["location"].append(session["location"])
+            counters["date"].append(session["date"])
+    sessions = pd.DataFrame(sessions)
+    sessions["date"] = pd.to_datetime(sessions["date"])
+    sessions["duration"] = pd.to_timedelta(sessions["duration"]).dt.total_seconds() / 60
+    counters = pd.DataFrame(counters)
+    counters["date"] = pd.to_datetime(counters["date"])
+    # Grades missing from the location's scale are listed last
+    counters["grade_index"] = counters["grade_index"].astype(float).fillna(np.inf)
+    return sessions, counters
+
+
+def grade_pyramid(counters):
+    """
+    Count the problems sent and attempted at every grade of every location.
+
+    :param counters: counters data frame
+    :type counters: pandas.DataFrame
+    :return: sends and attempts by location and grade, in order of difficulty
+    :rtype: pandas.DataFrame
+    """
+    pyramid = counters.groupby(["location", "grade_index", "grade"], sort=True)[
+        _SENDS
+    ].sum()
+    return pyramid.droplevel("grade_index")
+
+
+def send_rate(counters):
+    """
+    Compute the ratio of problems sent to problems tried at every grade.
+
+    :param counters: counters data frame
+    :type counters: pandas.DataFrame
+    :return: send and flash rates by location and grade, in order of difficulty
+    :rtype: pandas.DataFrame
+    """
+    totals = counters.groupby(["location", "grade_index", "grade"], sort=True)[
+        ["flash", "completed", "total"]
+    ].sum()
+    rates = pd.DataFrame(
+        {
+            "tried": totals["total"],
+            "sent": totals["completed"],
+            "send_rate": totals["completed"] / totals["total"],
+            "flash_rate": totals["flash"] / totals["total"],
+        }
+    )
+    return rates.droplevel("grade_index")
+
+
+def weekly_volume(sessions):
+    """
+    Sum the sessions, problems and hours climbed every week.
+
+    Weeks start on Monday, weeks without a session are included.
+
+    :param sessions: sessions data frame
+    :type sessions: pandas.DataFrame
+    :return: volume by week
+    :rtype: pandas.DataFrame
+    """
+    weeks = sessions.set_index("date").resample("W-MON", label="left", closed="left")
+    volume = weeks.agg(
+        {
+            "location": "count",
+            "total_problems": "sum",
+            "completed": "sum",
+            "duration": "sum",
+        }
+    )
+    volume.columns = ["sessions", "problems", "completed", "hours"]
+    volume["hours"] = volume["hours"] / 60
+    volume.index.name = "week"
+    return volume
+
+
+def duration_trend(sessions, window=3):
+    """
+    Summarize the duration of sessions every month.
+
+    :param sessions: sessions data frame
+    :param window: number of months in the rolling average
+    :type sessions: pandas.DataFrame
+    :type window: int
+    :return: session count and duration in minutes by month
+    :rtype: pandas.DataFrame
+    """
+    months = sessions.set_index("date")["duration"].resample("MS")
+    trend = pd.DataFrame(
+        {
+            "sessions": months.count(),
+            "mean": months.mean(),
+            "median": months.median(),
+            "longest": months.max(),
+        }
+    )
+    trend["rolling_mean"] = trend["mean"].rolling(window, min_periods=1).mean()
+    trend.index.name = "month"
+    return trend
+
+
+# Stats that can be reported, computed from the sessions or counters data frame
+REPORTS = {
+    "pyramid": ("counters", grade_pyramid),
+    "send-rate": ("counters", send_rate),
+    "weekly": ("sessions", weekly_volume),
+    "duration": ("sessions", duration_trend),
+}
+
+
+def compute_stats(records, reports=None, location=None):
+    """
+    Compute climbing stats from parsed climbing logs.
+
+    :param records: documents generated by parse_session
+    :param reports: Optional - names of the stats to compute (Default: all)
+    :param location: Optional - only include sessions at this location
+    :type records: iterable of dict
+    :type reports: list of str
+    :type location: str
+    :return: data frame of every stat, keyed by name
+    :rtype: dict of pandas.DataFrame
+    """
+    sessions, counters = build_frames(records, location=location)
+    frames = {"sessions": sessions, "counters": counters}
+    return {
+        name: REPORTS[name][1](frames[REPORTS[name][0]]) for name in reports or REPORTS
+    }
+
+
+def to_json(stats):
+    """
+    Convert climbing stats into a json string.
+
+    :param stats: data frame of every stat, keyed by name
+    :type stats: dict of pandas.DataFrame
+    :return: json object with a list of rows for every stat
+    :rtype: str
+    """
+    return json.dumps(
+        {
+            name: json.loads(
+                frame.reset_index().to_json(orient="records", date_format="iso")
+            )
+            for name, frame in stats.items()
+        },
+        indent=2,
+    )
+
+
+def to_text(stats):
+    """
+    Format climbing stats as plain text tables.
+
+    :param stats: data frame of every stat, keyed by name
+    :type stats: dict of pandas.DataFrame
+    :return: a table for every stat
+    :rtype: str
+    """
+    return "\n\n".join(
+        f"{name}\n{frame.to_string(float_format=lambda value: f'{value:.2f}')}"
+        for name, frame in stats.items()
+    )
@@ -0,0 +1,118 @@
+#!/usr/bin/python3
+"""This module contains the parser for time strings in climbing logs and bookings."""
+import re
+from datetime import datetime
+from functools import lru_cache
+
+# 12 hour time (ie. 7:30 PM, 07:30 PM, 7 PM, 07 PM)
+_TIME_12_HOUR = re.compile(r"(1[0-2]|0[1-9]|[1-9])(?::([0-5][0-9]))? (AM|PM)")
+# 24 hour time (ie. 19:30, 7:30)
+_TIME_24_HOUR = re.compile(r"([01][0-9]|2[0-3]|[0-9]):([0-5][0-9])")
+_DIGITS = frozenset("0123456789")
+
+
+def _parse_fast(string):
+    """
+    Parse the common H:MM AM/PM, HH:MM AM/PM and HH:MM formats without regex.
+
+    :param string: time string
+    :type string: str
+    :return: hour and minute in 24 hour time, None if the format isn't a common one
+    :rtype: tuple of int or None
+    """
+    length = len(string)
+    if length == 5:
+        hour, minute = string[:2], string[3:]
+        suffix = None
+    elif length in (7, 8) and string[-3] == " ":
+        hour, minute = string[: length - 6], string[-5:-3]
+        suffix = string[-2:]
+    else:
+        return None
+    if (
+        string[len(hour)] != ":"
+        or not _DIGITS.issuperset(hour)
+        or not _DIGITS.issuperset(minute)
+    ):
+        return None
+    hour, minute = int(hour), int(minute)
+    if minute > 59:
+        return None
+    if suffix is None:
+        return (hour, minute) if hour <= 23 else None
+    if not 1 <= hour <= 12 or suffix not in ("AM", "PM"):
+        return None
+    return hour % 12 + (12 if suffix == "PM" else 0), minute
+
+
+@lru_cache(maxsize=512)
+def parse_time(string):
+    """
+    Parse a time string in 12 or 24 hour format.
+
+    Results are memoized, climbing logs and bookings only use a handful of
+    distinct times.
+
+    :param string: time in 12 or 24 hour format
+    :type string: str
+    :raises ValueError: Unexpected time format
+    :return: hour and minute in 24 hour time
+    :rtype: tuple of int
+    """
+    parsed = _parse_fast(string)
+    if parsed is not None:
+        return parsed
+    match = _TIME_12_HOUR.fullmatch(string)
+    if match:
+        hour, minute, suffix = match.groups()
+        return int(hour) % 12 + (12 if suffix == "PM" else 0), int(minute or 0)
+    match = _TIME_24_HOUR.fullmatch(string)
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    raise ValueError(f"Unexpected time format '{string}'")
+
+
+@lru_cache(maxsize=512)
+def to_datetime(string):
+    """
+    Convert a time string to a datetime object on 1900-01-01.
+
+    :param string: time in 12 or 24 hour format
+    :type string: str
+    :raises ValueError: Unexpected time format
+    :return: datetime object
+    :rtype: datetime
+    """
+    hour, minute = parse_time(string)
+    return datetime(1900, 1, 1, hour, minute)
+
+
+@lru_cache(maxsize=512)
+def to_24_hour(string):
+    """
+    Convert a time string to HH:MM format.
+
+    :param string: time in 12 or 24 hour format
+    :type string: str
+    :raises ValueError: Unexpected time format
+    :return: Time in HH:MM format
+    :rtype: str
+    """
+    hour, minute = parse_time(string)
+    return f"{hour:02d}:{minute:02d}"
+
+
+@lru_cache(maxsize=512)
+def to_12_hour(string):
+    """
+    Convert a time string to HH:MM AM/PM format.
+
+    :param string: time in 12 or 24 hour format
+    :type string: str
+    :raises ValueError: Unexpected time format
+    :return: Time in HH:MM AM/PM format
+    :rtype: str
+    """
+    hour, minute = parse_time(string)
+    suffix = "PM" if hour >= 12 else "AM"
+    return f"{hour % 12 or 12:02d}:{minute:02d} {suffix}"
@@ -19,3 +19,12 @@ to_notify = ""
 default_gym = ""
 shoes = ["Shoes_Here", "Shoes_Here"]
 climbers = ["Climber A", "Climber B"]
+
+# Only index the counters of grades that were climbed in a session, instead of a
+# counter for every grade in the location's scale. Same as 'update --sparse-counters'
+# The grade visualizations shipped with climbr bucket grades with Filters, which keep
+# grades that weren't climbed. Dashboards that need every grade of a scale can use a
+# Histogram on 'grade_index' (the grade's position in the scale) with an interval of
+# 1, empty buckets shown and bounds of 0 to the scale's length - 1, filtered to the
+# locations of a single scale
+sparse_counters = False
@@ -8,8 +8,17 @@ import nox
 nox.options.sessions = (
     "lint",
     "safety",
+    "tests",
+)
+locations = (
+    "web_scraper",
+    "noxfile.py",
+    "climbr.py",
+    "config.py",
+    "common",
+    "benchmarks",
+    "tests",
 )
-locations = "web_scraper", "noxfile.py", "climbr.py", "config.py", "common"
 
 
 def install_with_constraints(session, *args, **kwargs):
@@ -73,3 +82,12 @@ def safety(session):
         install_with_constraints(session, "safety")
         session.run("safety", "check", f"--file={requirements.name}", "--full-report")
     Path(requirements.name).unlink()
+
+
+@nox.session
+def tests(session):
+    """Run test suite."""
+    args = session.posargs or ["tests"]
+    session.run("poetry", "install", "--no-dev", external=True)
+    install_with_constraints(session, "pytest")
+    session.run("pytest", *args)
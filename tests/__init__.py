@@ -0,0 +1 @@
+"""Tests for climbr and the web scraper."""
@@ -0,0 +1,210 @@
+"""Tests for loading climbing locations from data/locations.yaml."""
+import pytest
+
+import common.constants as constants
+import common.globals as glbs
+import common.session as session
+
+_ALTITUDE_SCALE = [
+    "VB/V0",
+    "V0/V1",
+    "V1/V2",
+    "V2/V3",
+    "V3/V4",
+    "V4/V5",
+    "V5/V6",
+    "V6/V7",
+    "V7/V8",
+    "V8/V9",
+    "V9+",
+    "Kids - VB/V0",
+    "Kids - V0/V1",
+    "Kids - V1/V2",
+    "Kids - V2/V3",
+    "Kids - V3/V4",
+    "Kids - V4/V5",
+    "Kids - V5/V6",
+    "Kids - V6/V7",
+    "Kids - V7/V8",
+    "Kids - V8/V9",
+    "Kids - V9+",
+    "competition",
+    "routesetting-squad",
+]
+_COYOTE_SCALE = [
+    "White",
+    "Orange",
+    "Red",
+    "Blue",
+    "Green",
+    "Purple",
+    "Black",
+    "Ungraded",
+]
+_COLOUR_SCALE = [
+    "White",
+    "Yellow",
+    "Orange",
+    "Green",
+    "Blue",
+    "Purple",
+    "Red",
+    "Black",
+    "Pink",
+]
+# Locations as they were defined in common/session.py before the registry:
+# name, address, lat, lon, grading, is_outdoor
+_LOCATIONS = [
+    (
+        "Altitude Kanata",
+        "0E5, 501 Palladium Dr, Kanata, ON K2V 0E5",
+        45.297970,
+        -75.911150,
+        _ALTITUDE_SCALE,
+        False,
+    ),
+    (
+        "Altitude Gatineau",
+        "35 Boulevard Saint-Raymond, Gatineau, QC J8Y 1R5",
+        45.446861,
+        -75.736801,
+        _ALTITUDE_SCALE,
+        False,
+    ),
+    (
+        "Hog's Back Falls",
+        "Hog's Back Falls, Ottawa, ON",
+        45.3710517,
+        -75.698022,
+        constants.V_SCALE,
+        True,
+    ),
+    (
+        "Calabogie",
+        "Greater Madawaska, Ontario",
+        45.264209,
+        -76.813545,
+        constants.V_SCALE,
+        True,
+    ),
+    (
+        "Lac Beauchamp",
+        "Lac Beauchamp, Gatineau, QC",
+        45.490288,
+        -75.617274,
+        constants.V_SCALE,
+        True,
+    ),
+    (
+        "Coyote Rock Gym",
+        "1737B St Laurent Blvd, Ottawa, ON K1G 3V4",
+        45.406130,
+        -75.625500,
+        _COYOTE_SCALE,
+        False,
+    ),
+    (
+        "Klimat Wakefield",
+        "911-A Chemin Riverside, Wakefield, QC J0X 3G0",
+        45.648430,
+        -75.927340,
+        constants.V_SCALE,
+        False,
+    ),
+    (
+        "Up the Bloc",
+        "1224 Dundas St E #28, Mississauga, ON L4Y 4A2",
+        43.6037512,
+        -79.5866032,
+        _COLOUR_SCALE,
+        False,
+    ),
+    (
+        "Cafe Bloc",
+        "1209-1211 St Laurent Blvd, Montreal, QC H2X 2S6",
+        45.5096931,
+        -73.5652951,
+        constants.V_SCALE,
+        False,
+    ),
+    (
+        "Bloc Shop Hochelaga",
+        "2985 St Catherine St E, Montreal, QC H1W 3Y8",
+        45.5341923,
+        -73.6355159,
+        constants.V_SCALE,
+        False,
+    ),
+    (
+        "Bloc Shop Chabanel",
+        "1370 Rue Chabanel O, Montréal, QC H4N 1H4",
+        45.531948,
+        -73.6599657,
+        constants.V_SCALE,
+        False,
+    ),
+    (
+        "Allez Up",
+        "1555 Rue Saint-Patrick, Montréal, QC H3K 2B7",
+        45.4868841,
+        -73.5632112,
+        _COLOUR_SCALE,
+        False,
+    ),
+]
+# Gyms as they were defined in web_scraper/utils/setup_firestore.py:
+# name, city, province, country, postal, capacity
+_FIRESTORE_LOCATIONS = [
+    ("Altitude Kanata", "Ottawa", "Ontario", "Canada", "K2V 0E5", 50),
+    ("Altitude Gatineau", "Gatineau", "Quebec", "Canada", "J8Y 1R5", 75),
+    ("Coyote Rock Gym", "Ottawa", "Ontario", "Canada", "K1G 3V4", 50),
+]
+
+
+@pytest.fixture(scope="module")
+def registry():
+    """Load the locations shipped with climbr."""
+    return session.LocationRegistry.fromFile(glbs.LOCATIONS_FILE)
+
+
+def test_locations_match_baseline(registry):
+    """Every location is loaded as it was defined in code, in the same order."""
+    loaded = [
+        (
+            location.name,
+            location.address,
+            location.lat,
+            location.lon,
+            location.grading,
+            location.is_outdoor,
+        )
+        for location in registry
+    ]
+    assert loaded == _LOCATIONS
+
+
+def test_firestore_details_match_baseline(registry):
+    """Gyms pushed to Firestore keep their address details and capacity."""
+    for name, city, province, country, postal, capacity in _FIRESTORE_LOCATIONS:
+        location = registry.get(name)
+        assert (
+            location.city,
+            location.province,
+            location.country,
+            location.postal,
+            location.capacity,
+        ) == (city, province, country, postal, capacity)
+
+
+def test_kids_grades(registry):
+    """Only Altitude Kanata tracks kids problems separately."""
+    assert [location.name for location in registry if location.has_kids_grades] == [
+        "Altitude Kanata"
+    ]
+
+
+def test_aliases(registry):
+    """Locations are found by name or alias, ignoring case."""
+    assert registry.get("kanata") is registry.get("Altitude Kanata")
+    assert registry.get("ALTITUDE GATINEAU").name == "Altitude Gatineau"
+    assert registry.get("Unknown Gym") is None
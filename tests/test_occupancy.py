@@ -0,0 +1,108 @@
+"""Tests for reading occupancy portal pages without a browser."""
+import os
+from argparse import Namespace
+from datetime import datetime
+
+import pytest
+
+import web_scraper.bookings as bookings
+import web_scraper.utils.occupancy as occupancy
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+URL = "https://portal.rockgympro.com/portal/public/abc/occupancy?fId=1658"
+
+
+def load_fixture(name):
+    """Return the contents of a saved page."""
+    with open(os.path.join(FIXTURES, name), "r") as file:
+        return file.read()
+
+
+class FakeResponse:
+    """Response of a request for a saved page."""
+
+    def __init__(self, text):
+        """Create a successful response."""
+        self.text = text
+
+    def raise_for_status(self):
+        """Succeed like a 200 response."""
+
+
+@pytest.fixture
+def portal(monkeypatch):
+    """Serve a saved page for every request to the occupancy portal."""
+
+    def serve(name):
+        text = load_fixture(name)
+        monkeypatch.setattr(
+            occupancy._SESSION, "get", lambda url, timeout: FakeResponse(text)
+        )
+
+    return serve
+
+
+def test_parse_occupancy():
+    """Every facility of a portal page is read, with numbers and strings."""
+    data = occupancy.parse_occupancy(load_fixture("occupancy.html"))
+    assert set(data) == {"GAT", "KAN"}
+    assert data["GAT"]["capacity"] == 83
+    assert data["GAT"]["count"] == 31
+    assert data["KAN"] == {
+        "capacity": 100,
+        "count": 57,
+        "subLabel": "It's getting busy",
+        "lastUpdate": "Last updated:&nbsp;now  (6:40 PM)",
+    }
+
+
+def test_parse_occupancy_without_data():
+    """A page without occupancy data can't be parsed."""
+    with pytest.raises(ValueError):
+        occupancy.parse_occupancy("<html><body>Service unavailable</body></html>")
+
+
+def test_parse_occupancy_with_braces_in_strings():
+    """Braces and semicolons inside strings don't end the data."""
+    data = occupancy.parse_occupancy(load_fixture("occupancy_braces.html"))
+    assert data == {
+        "GAT": {
+            "capacity": 83,
+            "count": 12,
+            "subLabel": "Open {today} until 10 PM };",
+            "lastUpdate": "Last updated:&nbsp;now  (9:05 AM)",
+            "closed": False,
+        }
+    }
+
+
+def test_parse_occupancy_incomplete():
+    """A page cut off in the middle of the data can't be parsed."""
+    html = load_fixture("occupancy.html")
+    with pytest.raises(ValueError):
+        occupancy.parse_occupancy(html[: html.index("'KAN'")])
+
+
+def test_get_occupancy_http(portal):
+    """Facilities are read from a single request."""
+    portal("occupancy.html")
+    data = bookings.get_occupancy_http("Altitude", URL, ["GAT", "KAN"])
+    assert data["GAT"]["count"] == 31
+    assert data["KAN"]["count"] == 57
+
+
+def test_get_occupancy_http_missing_facility(portal):
+    """A facility missing from the page falls back to Selenium."""
+    portal("occupancy_braces.html")
+    assert bookings.get_occupancy_http("Altitude", URL, ["GAT", "KAN"]) is None
+
+
+def test_scrape_occupancy_read_time(portal):
+    """Bookings are timestamped when their page was read, not when the run ends."""
+    portal("occupancy.html")
+    args = Namespace(selenium=False, timeout=1)
+    before = datetime.now()
+    data, read_at = bookings.scrape_occupancy(None, "Altitude", URL, ["KAN"], args)
+    assert before <= read_at <= datetime.now()
+    booking = bookings.capacity_booking("Altitude Kanata", 57, 100, read_at)
+    assert booking["retrieved_at"] == read_at.isoformat()
@@ -0,0 +1,237 @@
+"""Tests for the scheduler of the booking scraper daemon."""
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+import web_scraper.utils.scheduler as scheduler
+
+
+class FakeClock:
+    """Time that only moves forward when told to."""
+
+    def __init__(self, start):
+        """Stop the clock at a given time."""
+        self.time = start
+
+    def now(self):
+        """Return the current time."""
+        return self.time
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the time seen by the scheduler with a fake clock."""
+    fake = FakeClock(datetime(2022, 1, 10, 9, 59))
+
+    class FakeDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return fake.now()
+
+    monkeypatch.setattr(scheduler, "datetime", FakeDatetime)
+    return fake
+
+
+def write_history(path, samples, mtime):
+    """Save occupancy samples as a bookings bulk json, modified at a given time."""
+    with open(path, "w") as file:
+        for sample in samples:
+            location, retrieved_at, percent_full = sample[:3]
+            booking = {
+                "location": location,
+                "percent_full": percent_full,
+                "retrieved_at": retrieved_at.isoformat(),
+            }
+            if len(sample) > 3:
+                booking["time_slot"] = sample[3]
+            file.write('{"index": {"_index": "bookings"}}\n')
+            file.write(json.dumps(booking) + "\n")
+    os.utime(path, (mtime, mtime))
+
+
+def monday(hour, minute=0, weeks_ago=0):
+    """Return a time on Monday 2022-01-10, or a Monday before it."""
+    return datetime(2022, 1, 10, hour, minute) - timedelta(weeks=weeks_ago)
+
+
+def samples(hour, values, location="Altitude Gatineau", weeks_ago=1):
+    """Return occupancy samples of a location read during an hour of a Monday."""
+    return [
+        (location, monday(hour, minute * 5, weeks_ago), value)
+        for minute, value in enumerate(values)
+    ]
+
+
+@pytest.fixture
+def history(tmp_path):
+    """Occupancy history of Gatineau's capacity on Mondays."""
+    path = str(tmp_path / "bookings.json")
+    write_history(
+        path,
+        # Most volatile hour, standard deviation of 50
+        samples(18, [0, 100, 0, 100])
+        # Standard deviations of 40 and 25
+        + samples(13, [10, 90, 10, 90]) + samples(12, [25, 75, 25, 75])
+        # Flat hour
+        + samples(10, [40, 40, 40])
+        # Too few samples
+        + samples(20, [0, 100])
+        # Older than the history used
+        + samples(16, [0, 100, 0], weeks_ago=9)
+        # Other location, and reservations of a time slot
+        + samples(14, [0, 100, 0], location="Altitude Kanata")
+        + [
+            ("Altitude Gatineau", monday(15, minute, 1), 100 * (minute % 2), "3 PM")
+            for minute in range(4)
+        ],
+        mtime=1,
+    )
+    return path
+
+
+def adaptive_job(history, schedule="* 9-22 * * *", **intervals):
+    """Create an adaptive job scraping Gatineau's capacity."""
+    return scheduler.AdaptiveJob(
+        "capacity", [schedule], ["Altitude_Gatineau_Capacity"], history, **intervals
+    )
+
+
+def run_twice(clock, job, first_run):
+    """Run a job twice, the first run being late, and return when both started."""
+    runs = []
+
+    def run(due):
+        runs.append(clock.time)
+        if len(runs) == 1:
+            first_run()
+        else:
+            daemon.stop()
+
+    def wait(timeout):
+        # The machine falls asleep before the first run, due at 10:00
+        if not runs:
+            clock.time = datetime(2022, 1, 10, 14, 47)
+        else:
+            clock.time += timedelta(minutes=1)
+
+    daemon = scheduler.Scheduler([job], run, max_sleep=0)
+    daemon.stopping.wait = wait
+    daemon.run_forever()
+    return runs
+
+
+def test_cron_expression():
+    """Cron fields are expanded, and the next run is found across days."""
+    cron = scheduler.CronExpression("*/30 9-22 * * 1-5")
+    assert cron.next_after(datetime(2022, 1, 10, 9, 0)) == datetime(2022, 1, 10, 9, 30)
+    # Friday night runs next on Monday morning
+    assert cron.next_after(datetime(2022, 1, 14, 22, 30)) == datetime(2022, 1, 17, 9, 0)
+    with pytest.raises(ValueError):
+        scheduler.CronExpression("*/30 9-25 * * *")
+
+
+def test_late_run_is_not_repeated(clock):
+    """A run that starts late covers the times it missed."""
+    job = scheduler.Job("capacity", ["*/30 * * * *"], ["Altitude_Gatineau_Capacity"])
+
+    def first_run():
+        clock.time += timedelta(minutes=1)
+
+    runs = run_twice(clock, job, first_run)
+    assert runs == [datetime(2022, 1, 10, 14, 47), datetime(2022, 1, 10, 15, 0)]
+
+
+def test_long_run_is_caught_up_once(clock):
+    """Times that pass while a run takes too long are caught up right away."""
+    job = scheduler.Job("capacity", ["*/30 * * * *"], ["Altitude_Gatineau_Capacity"])
+
+    def first_run():
+        clock.time += timedelta(minutes=75)
+
+    runs = run_twice(clock, job, first_run)
+    assert runs == [datetime(2022, 1, 10, 14, 47), datetime(2022, 1, 10, 16, 2)]
+
+
+def test_adaptive_intervals(clock, history):
+    """Volatile hours are sampled more often, and hours without history the least."""
+    job = adaptive_job(history)
+    job.refresh()
+    assert job.interval(monday(18)) == 10
+    # 60 - 50 * 40 / 50 and 60 - 50 * 25 / 50, snapped to divisors of an hour
+    assert job.interval(monday(13)) == 20
+    assert job.interval(monday(12)) == 30
+    assert job.interval(monday(10)) == 60
+    for hour in [20, 16, 14, 15, 9]:
+        assert job.interval(monday(hour)) == 60
+    # Only the same weekday is used
+    assert job.interval(monday(18) + timedelta(days=1)) == 60
+
+
+def test_adaptive_runs(clock, history):
+    """Runs land on the same minutes of every hour."""
+    job = adaptive_job(history)
+    assert job.next_after(monday(18)) == monday(18, 10)
+    assert job.next_after(monday(18, 10)) == monday(18, 20)
+    assert job.next_after(monday(17, 50)) == monday(18)
+    assert job.next_after(monday(12, 7)) == monday(12, 30)
+    assert job.next_after(monday(10)) == monday(11)
+    # Only during the hours of the cron expression
+    assert job.next_after(monday(22)) == monday(9) + timedelta(days=1)
+
+
+def test_adaptive_without_history(clock, tmp_path):
+    """Without history, every hour is sampled every max_interval minutes."""
+    job = adaptive_job(str(tmp_path / "bookings.json"), max_interval=30)
+    assert job.next_after(monday(18)) == monday(18, 30)
+    assert job.interval(monday(10)) == 30
+
+
+def test_adaptive_history_refresh(clock, tmp_path):
+    """Intervals are computed again once the history changes."""
+    path = str(tmp_path / "bookings.json")
+    job = adaptive_job(path)
+    assert job.next_after(monday(18)) == monday(19)
+    write_history(path, samples(18, [0, 100, 0, 100]), mtime=1)
+    assert job.next_after(monday(18)) == monday(18, 10)
+    write_history(path, samples(19, [0, 100, 0, 100]), mtime=1)
+    # Unchanged modification time, the history isn't read again
+    assert job.next_after(monday(19)) == monday(20)
+    write_history(path, samples(18, [40] * 3), mtime=2)
+    assert job.next_after(monday(18)) == monday(19)
+
+
+def test_adaptive_intervals_divide_an_hour(history):
+    """Intervals are rounded to divisors of an hour, or of a day past an hour."""
+    assert adaptive_job(history, min_interval=7, max_interval=50).intervals == [
+        10,
+        12,
+        15,
+        20,
+        30,
+    ]
+    assert adaptive_job(history, min_interval=60, max_interval=240).intervals == [
+        60,
+        120,
+        180,
+        240,
+    ]
+    with pytest.raises(ValueError):
+        adaptive_job(history, min_interval=7, max_interval=9)
+
+
+def test_adaptive_cron_off_interval(clock, history):
+    """Jobs run at the first time of their cron expression in every interval."""
+    job = adaptive_job(history, schedule="*/30 9-22 * * *")
+    job.refresh()
+    assert job.interval(monday(13)) == 20
+    # :30 isn't on the 20 minute interval, but is the first run after :20
+    assert job.next_after(monday(13)) == monday(13, 30)
+    assert job.next_after(monday(13, 30)) == monday(14)
+    # Runs every 30 minutes during the most volatile hour too
+    assert job.next_after(monday(18)) == monday(18, 30)
+    # Runs at :05 every hour, never on the hourly interval
+    job = adaptive_job(history, schedule="5 9-22 * * *")
+    assert job.next_after(monday(9, 30)) == monday(10, 5)
+    assert job.next_after(monday(10, 5)) == monday(11, 5)
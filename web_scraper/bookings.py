@@ -1,17 +1,28 @@
 #!/usr/bin/python3
 """Tool used to gather Altitude's session availability from their booking website."""
 
+import json
 import os
 import platform
+import signal
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from time import sleep
+from time import perf_counter
 
+import requests
 from loguru import logger
 from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions
+from selenium.webdriver.support.ui import WebDriverWait
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(BASE_DIR)
@@ -20,8 +31,48 @@ import common.globals as glbs  # noqa
 import common.validate as validate  # noqa
 import config as config  # noqa
 import web_scraper.utils.args as cmd_args  # noqa
+import web_scraper.utils.occupancy as occupancy  # noqa
+import web_scraper.utils.scheduler as scheduler  # noqa
 
 OUTPUT_FILE = os.path.join(glbs.ES_BULK_DATA, "bookings.json")
+# Booking pages of every location
+LOCATIONS = {
+    "Altitude Gatineau": {
+        "url": "https://portal.rockgympro.com/portal/public/d8debad49996f64b9734856be4913a25/occupancy?&iframeid=occupancyCounter&fId=1658",  # noqa
+        "reservation": True,
+        "zone": {
+            "Annex": {
+                "url": "https://app.rockgympro.com/b/widget/?a=offering&offering_guid=88c1f4559dcf48a8b4db0c062faad971&widget_guid=ce62e0ff738e4faf8042bafa71fa48e5&random=61c1e39ab0351&iframeid=&mode=p",  # noqa
+                "capacity": 25,
+            },
+            "Main": {
+                "url": "https://app.rockgympro.com/b/widget/?a=offering&offering_guid=14fa372e850d43f6a725aff3e0fef115&widget_guid=ce62e0ff738e4faf8042bafa71fa48e5&random=61c1e39aae36d&iframeid=&mode=p",  # noqa
+                "capacity": 25,
+            },
+            "Basement": {
+                "url": "https://app.rockgympro.com/b/widget/?a=offering&offering_guid=f3613ad8e2fd436f8aff84a0fc87e6ef&widget_guid=ce62e0ff738e4faf8042bafa71fa48e5&random=61c1e39aaf518&iframeid=&mode=p",  # noqa
+                "capacity": 25,
+            },
+            "Training": {
+                "url": "https://app.rockgympro.com/b/widget/?a=offering&offering_guid=e686357a778843b2b4afafefb36f3e72&widget_guid=ce62e0ff738e4faf8042bafa71fa48e5&random=61c1e39ab1534&iframeid=&mode=p",  # noqa
+                "capacity": 8,
+            },
+        },
+    },
+    "Altitude Gatineau Capacity": {
+        "url": "https://portal.rockgympro.com/portal/public/d8debad49996f64b9734856be4913a25/occupancy?&iframeid=occupancyCounter&fId=1658",  # noqa
+        "reservation": False,
+    },
+    "Altitude Kanata": {
+        "url": "https://portal.rockgympro.com/portal/public/d8debad49996f64b9734856be4913a25/occupancy?&iframeid=occupancyCounter&fId=1748",  # noqa
+        "reservation": False,
+    },
+    "Coyote Rock Gym": {
+        "url": "https://app.rockgympro.com/b/widget/?a=offering&offering_guid=2fdc519b5db6455f84c3a687d0a40c64&random=5f79eb6c8450f&iframeid=&mode=p",  # noqa
+        "reservation": True,
+        "capacity": 80,
+    },
+}
 if config.firestore_json:
     db = common.connect_to_firestore()
 
@@ -55,85 +106,179 @@ def error_callback(message):
     sys.exit(1)
 
 
-# Logging
-logger.remove()
-# System out
-stdout_fmt = "{level: <8}{message}"
-logger.add(sys.stdout, level="INFO", format=stdout_fmt)
-# Log file
-logfile_fmt = "[{time:YYYY-MM-DD HH:mm:ss}] {level: <8}\t{message}"
-logger.add(
-    os.path.join(glbs.WEB_SCRAPER_LOG_DIR, "web_scraper.log"),
-    level="INFO",
-    format=logfile_fmt,
-    rotation="monthly",
-)
-# Error email handling
-logger.add(error_callback, filter=lambda r: r["level"].name == "ERROR")
+def setup_logging():
+    """Log to stdout and the scraper's log file, and email errors."""
+    logger.remove()
+    # System out
+    stdout_fmt = "{level: <8}{message}"
+    logger.add(sys.stdout, level="INFO", format=stdout_fmt)
+    # Log file
+    logfile_fmt = "[{time:YYYY-MM-DD HH:mm:ss}] {level: <8}\t{message}"
+    logger.add(
+        os.path.join(glbs.WEB_SCRAPER_LOG_DIR, "web_scraper.log"),
+        level="INFO",
+        format=logfile_fmt,
+        rotation="monthly",
+    )
+    # Error email handling
+    logger.add(error_callback, filter=lambda r: r["level"].name == "ERROR")
 
 
-def get_capacity(driver, location, url):
+def save_screenshot(driver, location):
     """
-    Gather the live occupancy numbers based on the location.
+    Save a screenshot of the current page to the image log directory.
 
     :param driver: Selenium driver
     :param location: The location of the climbing gym
-    :param capacity: The max capacity of a climbing gym
-    :param url: Rockgympro booking url
     :type driver: driver
     :type location: str
-    :type capacity: int
-    :type url: str
-    :return: Booking infomation
-    :rtype: dict
     """
-    # Getting the current time
-    driver.get(url)
-    sleep(10)
-    current_datetime = datetime.now()
+    file_name_date = datetime.now().strftime("%Y-%m-%d-%H%M%S")
+    image_name = f"webscraper_{location.lower()}_{file_name_date}.png"
+    driver.save_screenshot(os.path.join(glbs.IMAGE_LOG_DIR, image_name))
 
-    # Grab data from website
-    try:
-        if "Gatineau" in location:
-            data = driver.execute_script("""return data.GAT""")
-            reserved_spots = int(data["count"])
-            # Counter on the site is incorrect,
-            # well at least not accurate to current zoning (150 vs 107)
-            # capacity = int(data["capacity"])
-            capacity = 83 + 24
-        elif "Kanata" in location:
-            data = driver.execute_script("""return data.KAN""")
-            reserved_spots = int(data["count"])
-            capacity = int(data["capacity"])
-        else:
-            logger.warning(
-                f"Unable to read location: {location}, "
-                "using generic parser instead..."
-            )
-            reserved_spots = int(driver.find_element(By.ID, "count").text)
-            capacity = int(
-                driver.find_element(By.ID, "capacity").text.strip("of").strip()
-            )
-        if reserved_spots > capacity:
-            logger.warning(
-                "There are more reservations than "
-                f"the current allowed capcity for '{location}'. "
-                "Please verify if the numbers are correct."
-            )
-        percent_full = (reserved_spots / capacity) * 100
 
-    # Take a screenshot if there is an error
-    except NoSuchElementException as ex:
-        file_name_date = datetime.now().strftime("%Y-%m-%d-%H%M%S")
-        image_name = f"webscraper_{location.lower()}_{file_name_date}.png"
-        driver.save_screenshot(os.path.join(glbs.IMAGE_LOG_DIR, image_name))
+def wait_until(driver, condition, location, timeout, poll_interval):
+    """
+    Wait until a page is ready, and log how long it took.
+
+    :param driver: Selenium driver
+    :param condition: Function of the driver, returning a truthy value once ready
+    :param location: The location of the climbing gym
+    :param timeout: seconds to wait before giving up
+    :param poll_interval: seconds between checks of the condition
+    :type driver: driver
+    :type condition: function
+    :type location: str
+    :type timeout: float
+    :type poll_interval: float
+    :return: the value returned by the condition
+    """
+    start = perf_counter()
+    try:
+        result = WebDriverWait(driver, timeout, poll_frequency=poll_interval).until(
+            condition
+        )
+    except TimeoutException:
+        save_screenshot(driver, location)
         logger.error(
-            f"Unable to get capacity for {location}, "
+            f"The page for {location} was not ready after {timeout} seconds, "
             f"see {glbs.IMAGE_LOG_DIR} for more information."
         )
-        logger.error(ex)
         sys.exit(1)
-    booking = {
+    logger.info(f"['{location}'] Page ready in {perf_counter() - start:.2f}s")
+    return result
+
+
+def occupancy_data(facilities):
+    """
+    Return a condition that waits for the occupancy data of facilities.
+
+    :param facilities: facility codes used by the occupancy page (ie. GAT)
+    :type facilities: list of str
+    :return: Function of the driver, returning the data of every facility once
+        they're all defined
+    :rtype: function
+    """
+    script = (
+        f"return typeof data !== 'undefined' && {json.dumps(list(facilities))}"
+        ".every(function (facility) { return data[facility]; }) ? data : null"
+    )
+    return lambda driver: driver.execute_script(script)
+
+
+def schedule_of_day(day):
+    """
+    Return a condition that waits for the schedule of a day to be shown.
+
+    The schedule of the previously selected day is still on the page right after
+    clicking another day, so the first time slot is checked for the day itself.
+
+    :param day: day of the month (ie. 17)
+    :type day: int
+    :return: Function of the driver, returning the first time slot once it's on
+        that day
+    :rtype: function
+    """
+
+    def condition(driver):
+        rows = driver.find_elements(
+            By.CLASS_NAME, "offering-page-schedule-list-time-column"
+        )
+        try:
+            # ie. 'Sat, October 17, 9 AM to 11 AM'
+            return (
+                rows[0] if int(rows[0].text.split(",")[1].split()[1]) == day else None
+            )
+        except (IndexError, ValueError, StaleElementReferenceException):
+            return None
+
+    return condition
+
+
+# Facility codes used by the occupancy portal, by location
+FACILITIES = {"Gatineau": "GAT", "Kanata": "KAN"}
+
+
+def get_facility(location):
+    """
+    Return the occupancy portal's facility code of a location.
+
+    :param location: The location of the climbing gym
+    :type location: str
+    :return: facility code, None if the location isn't on the portal
+    :rtype: str or None
+    """
+    for name, facility in FACILITIES.items():
+        if name in location:
+            return facility
+    return None
+
+
+def read_occupancy(location, data):
+    """
+    Return the reserved spots and capacity from a facility's occupancy data.
+
+    :param location: The location of the climbing gym
+    :param data: occupancy data of the facility
+    :type location: str
+    :type data: dict
+    :return: reserved spots and capacity
+    :rtype: tuple of int
+    """
+    reserved_spots = int(data["count"])
+    if "Gatineau" in location:
+        # Counter on the site is incorrect,
+        # well at least not accurate to current zoning (150 vs 107)
+        # capacity = int(data["capacity"])
+        capacity = 83 + 24
+    else:
+        capacity = int(data["capacity"])
+    return reserved_spots, capacity
+
+
+def capacity_booking(location, reserved_spots, capacity, current_datetime):
+    """
+    Create booking information from the live occupancy of a location.
+
+    :param location: The location of the climbing gym
+    :param reserved_spots: number of climbers in the gym
+    :param capacity: The max capacity of a climbing gym
+    :param current_datetime: time the occupancy was read
+    :type location: str
+    :type reserved_spots: int
+    :type capacity: int
+    :type current_datetime: datetime
+    :return: Booking infomation
+    :rtype: dict
+    """
+    if reserved_spots > capacity:
+        logger.warning(
+            "There are more reservations than "
+            f"the current allowed capcity for '{location}'. "
+            "Please verify if the numbers are correct."
+        )
+    return {
         "location": location,
         "month": current_datetime.strftime("%B"),
         "day_of_week": current_datetime.strftime("%A"),
@@ -146,13 +291,146 @@ def get_capacity(driver, location, url):
         "availability": capacity - reserved_spots,
         "reserved_spots": reserved_spots,
         "capacity": capacity,
-        "percent_full": percent_full,
-        "retrieved_at": datetime.now().isoformat(),
+        "percent_full": (reserved_spots / capacity) * 100,
+        "retrieved_at": current_datetime.isoformat(),
     }
-    return booking
 
 
-def get_rgpro_bookings(driver, location, capacity, url, zone=None):
+def get_occupancy_http(label, url, facilities, timeout=glbs.SCRAPER_PAGE_TIMEOUT):
+    """
+    Read the occupancy data of facilities without a browser.
+
+    The occupancy portal embeds the numbers of every facility in the page, so a
+    single request is enough to read them.
+
+    :param label: name of the locations, used in logs
+    :param url: Rockgympro occupancy url
+    :param facilities: facility codes that must be in the page
+    :param timeout: seconds to wait for the page
+    :type label: str
+    :type url: str
+    :type facilities: list of str
+    :type timeout: float
+    :return: occupancy data keyed by facility, None if the page couldn't be read
+    :rtype: dict or None
+    """
+    start = perf_counter()
+    try:
+        data = occupancy.fetch_occupancy(url, timeout=timeout)
+        missing = [facility for facility in facilities if facility not in data]
+        if missing:
+            raise ValueError(f"no occupancy data for {', '.join(missing)}")
+    except (requests.RequestException, ValueError) as ex:
+        logger.warning(
+            f"Unable to read the occupancy of {label} without a browser,"
+            f" using Selenium instead... ({ex})"
+        )
+        return None
+    logger.info(f"['{label}'] Page read in {perf_counter() - start:.2f}s")
+    return data
+
+
+def get_occupancy(
+    driver,
+    label,
+    url,
+    facilities,
+    timeout=glbs.SCRAPER_PAGE_TIMEOUT,
+    poll_interval=glbs.SCRAPER_POLL_INTERVAL,
+):
+    """
+    Read the occupancy data of facilities with a browser.
+
+    :param driver: Selenium driver
+    :param label: name of the locations, used in logs
+    :param url: Rockgympro occupancy url
+    :param facilities: facility codes that must be in the page
+    :param timeout: seconds to wait for the page to be ready
+    :param poll_interval: seconds between checks of the page
+    :type driver: driver
+    :type label: str
+    :type url: str
+    :type facilities: list of str
+    :type timeout: float
+    :type poll_interval: float
+    :return: occupancy data keyed by facility
+    :rtype: dict
+    """
+    driver.get(url)
+    return wait_until(driver, occupancy_data(facilities), label, timeout, poll_interval)
+
+
+def get_capacity(
+    driver,
+    location,
+    url,
+    timeout=glbs.SCRAPER_PAGE_TIMEOUT,
+    poll_interval=glbs.SCRAPER_POLL_INTERVAL,
+):
+    """
+    Gather the live occupancy numbers based on the location with a browser.
+
+    :param driver: Selenium driver
+    :param location: The location of the climbing gym
+    :param url: Rockgympro booking url
+    :param timeout: seconds to wait for the page to be ready
+    :param poll_interval: seconds between checks of the page
+    :type driver: driver
+    :type location: str
+    :type url: str
+    :type timeout: float
+    :type poll_interval: float
+    :return: Booking infomation
+    :rtype: dict
+    """
+    facility = get_facility(location)
+    if facility:
+        data = get_occupancy(driver, location, url, [facility], timeout, poll_interval)[
+            facility
+        ]
+        return capacity_booking(
+            location, *read_occupancy(location, data), datetime.now()
+        )
+    driver.get(url)
+    # Getting the current time
+    current_datetime = datetime.now()
+
+    # Grab data from website
+    try:
+        logger.warning(
+            f"Unable to read location: {location}, using generic parser instead..."
+        )
+        wait_until(
+            driver,
+            expected_conditions.presence_of_element_located((By.ID, "count")),
+            location,
+            timeout,
+            poll_interval,
+        )
+        reserved_spots = int(driver.find_element(By.ID, "count").text)
+        capacity = int(driver.find_element(By.ID, "capacity").text.strip("of").strip())
+
+    # Take a screenshot if there is an error
+    except NoSuchElementException as ex:
+        save_screenshot(driver, location)
+        logger.error(
+            f"Unable to get capacity for {location}, "
+            f"see {glbs.IMAGE_LOG_DIR} for more information."
+        )
+        logger.error(ex)
+        sys.exit(1)
+    return capacity_booking(location, reserved_spots, capacity, current_datetime)
+
+
+def get_rgpro_bookings(
+    driver,
+    location,
+    capacity,
+    url,
+    zone=None,
+    timeout=glbs.SCRAPER_PAGE_TIMEOUT,
+    poll_interval=glbs.SCRAPER_POLL_INTERVAL,
+):
     """
     Gather booking information from RGPro based on the location.
 
@@ -161,10 +439,14 @@ def get_rgpro_bookings(driver, location, capacity, url, zone=None):
     :param capacity: The max capacity of a climbing gym
     :param url: Rockgympro booking url
     :param zone: Optional zone/subsection of gym
+    :param timeout: seconds to wait for the page to be ready
+    :param poll_interval: seconds between checks of the page
     :type driver: driver
     :type location: str
     :type capacity: int
     :type url: str
+    :type timeout: float
+    :type poll_interval: float
     :return: Booking infomation
     :rtype: dict
     """
@@ -176,6 +458,15 @@ def get_rgpro_bookings(driver, location, capacity, url, zone=None):
         current_day_of_week = datetime.now().strftime("%A")
 
         driver.get(url)
+        wait_until(
+            driver,
+            expected_conditions.presence_of_element_located(
+                (By.CLASS_NAME, "ui-datepicker-calendar")
+            ),
+            location,
+            timeout,
+            poll_interval,
+        )
         # Click on the current date, find the selected date and verify
         try:
             driver.find_element_by_xpath(
@@ -192,7 +483,14 @@ def get_rgpro_bookings(driver, location, capacity, url, zone=None):
                 f"Selected {selected_day} instead"
             )
             sys.exit(1)
-        sleep(5)
+        # Wait for the schedule of the selected date, not the one shown before
+        wait_until(
+            driver,
+            schedule_of_day(selected_day),
+            location,
+            timeout,
+            poll_interval,
+        )
         # Find the first time slot and it's availability
         try:
             time_slot = driver.find_element_by_class_name(
@@ -300,6 +598,248 @@ def get_driver():
     return webdriver.Chrome(service=Service(webdriver_path), options=chrome_options)
 
 
+class DriverPool:
+    """
+    Selenium drivers shared by a pool of threads, one driver per thread.
+
+    Drivers are only started once a thread needs one, so pages that are read
+    without a browser never start Chrome.
+    """
+
+    def __init__(self):
+        """Create an empty pool."""
+        self.drivers = {}
+        self.lock = threading.Lock()
+
+    def get(self):
+        """
+        Return the driver of the current thread, starting it if needed.
+
+        :return: Selenium driver
+        :rtype: driver
+        """
+        thread = threading.get_ident()
+        with self.lock:
+            driver = self.drivers.get(thread)
+        if driver is None:
+            driver = get_driver()
+            with self.lock:
+                self.drivers[thread] = driver
+        return driver
+
+    def quit(self):
+        """Quit every driver that was started, threads start a new one if needed."""
+        with self.lock:
+            drivers, self.drivers = self.drivers, {}
+        for driver in drivers.values():
+            try:
+                driver.quit()
+            except Exception as ex:
+                logger.warning(f"Unable to quit browser: {ex}")
+
+
+def scrape_occupancy(drivers, label, url, facilities, args):
+    """
+    Read the occupancy data of facilities, without a browser when possible.
+
+    :param drivers: Selenium drivers of the pool
+    :param label: name of the locations, used in logs
+    :param url: Rockgympro occupancy url
+    :param facilities: facility codes that must be in the page
+    :param args: command line arguments
+    :type drivers: DriverPool
+    :type label: str
+    :type url: str
+    :type facilities: list of str
+    :type args: dict
+    :return: occupancy data keyed by facility, and the time it was read
+    :rtype: tuple of dict and datetime
+    """
+    data = None
+    if not args.selenium:
+        data = get_occupancy_http(label, url, facilities, timeout=args.timeout)
+    if data is None:
+        data = get_occupancy(
+            drivers.get(),
+            label,
+            url,
+            facilities,
+            timeout=args.timeout,
+            poll_interval=args.poll_interval,
+        )
+    # Read here, other pages of the run may take much longer
+    return data, datetime.now()
+
+
+def scrape_capacity(drivers, location, url, args):
+    """
+    Gather the live occupancy of a location that isn't on the occupancy portal.
+
+    :param drivers: Selenium drivers of the pool
+    :param location: The location of the climbing gym
+    :param url: Rockgympro occupancy url
+    :param args: command line arguments
+    :type drivers: DriverPool
+    :type location: str
+    :type url: str
+    :type args: dict
+    :return: Booking infomation
+    :rtype: dict
+    """
+    return get_capacity(
+        drivers.get(),
+        location,
+        url,
+        timeout=args.timeout,
+        poll_interval=args.poll_interval,
+    )
+
+
+def scrape_bookings(drivers, location, capacity, url, args, zone=None):
+    """
+    Gather the booking information of a location, or one of its zones.
+
+    :param drivers: Selenium drivers of the pool
+    :param location: The location of the climbing gym
+    :param capacity: The max capacity of a climbing gym
+    :param url: Rockgympro booking url
+    :param args: command line arguments
+    :param zone: Optional zone/subsection of gym
+    :type drivers: DriverPool
+    :type location: str
+    :type capacity: int
+    :type url: str
+    :type args: dict
+    :type zone: str
+    :return: Booking infomation
+    :rtype: dict
+    """
+    return get_rgpro_bookings(
+        drivers.get(),
+        location,
+        capacity,
+        url,
+        zone=zone,
+        timeout=args.timeout,
+        poll_interval=args.poll_interval,
+    )
+
+
+def submit_pages(executor, drivers, names, locations, args):
+    """
+    Schedule the scraping of every page needed by the requested locations.
+
+    Locations on the same occupancy portal are read from a single page, and
+    identical pages are only scraped once.
+
+    :param executor: pool of threads scraping pages
+    :param drivers: Selenium drivers of the pool
+    :param names: requested locations
+    :param locations: urls and capacities of every location
+    :param args: command line arguments
+    :type executor: ThreadPoolExecutor
+    :type drivers: DriverPool
+    :type names: list of str
+    :type locations: dict
+    :type args: dict
+    :return: a future for every page of every location, in order of the zones
+    :rtype: dict of list
+    """
+    # Facilities requested from every portal, read from the first url requested
+    portals = {}
+    for name in names:
+        if not locations[name]["reservation"] and get_facility(name):
+            url = locations[name]["url"]
+            portal = portals.setdefault(
+                occupancy.get_portal(url), {"url": url, "names": [], "facilities": []}
+            )
+            portal["names"].append(name.replace("Capacity", "").strip())
+            portal["facilities"].append(get_facility(name))
+    submitted = {}
+
+    def submit(key, function, *arguments, **kwargs):
+        if key not in submitted:
+            submitted[key] = executor.submit(function, *arguments, **kwargs)
+        return submitted[key]
+
+    pages = {}
+    for name in names:
+        location = locations[name]
+        # Used to account for 2 types of rgpro systems, capacity vs reservation
+        if not location["reservation"] and get_facility(name):
+            portal = portals[occupancy.get_portal(location["url"])]
+            pages[name] = [
+                submit(
+                    portal["url"],
+                    scrape_occupancy,
+                    drivers,
+                    ", ".join(portal["names"]),
+                    portal["url"],
+                    portal["facilities"],
+                    args,
+                )
+            ]
+        elif not location["reservation"]:
+            pages[name] = [
+                submit(
+                    location["url"],
+                    scrape_capacity,
+                    drivers,
+                    name.replace("Capacity", "").strip(),
+                    location["url"],
+                    args,
+                )
+            ]
+        elif "zone" in location:
+            pages[name] = [
+                submit(
+                    zone["url"],
+                    scrape_bookings,
+                    drivers,
+                    name,
+                    zone["capacity"],
+                    zone["url"],
+                    args,
+                    zone=zone_name,
+                )
+                for zone_name, zone in location["zone"].items()
+            ]
+        else:
+            pages[name] = [
+                submit(
+                    location["url"],
+                    scrape_bookings,
+                    drivers,
+                    name,
+                    location["capacity"],
+                    location["url"],
+                    args,
+                )
+            ]
+    return pages
+
+
+def merge_zones(sub_bookings):
+    """
+    Combine the booking information of every zone of a location.
+
+    :param sub_bookings: booking information of every zone
+    :type sub_bookings: list of dict
+    :return: Booking infomation of the whole location
+    :rtype: dict
+    """
+    booking = sub_bookings[0].copy()
+    for sub_booking in sub_bookings[1:]:
+        booking["availability"] += sub_booking["availability"]
+        booking["reserved_spots"] += sub_booking["reserved_spots"]
+        booking["capacity"] += sub_booking["capacity"]
+        booking["percent_full"] = (
+            booking["reserved_spots"] / booking["capacity"]
+        ) * 100
+        booking["zone"] = None
+    return booking
+
+
 def update_firestore(booking):
     """
     Update firestore db with booking information.
@@ -392,18 +932,21 @@ def update_es(location):
         else glbs.KIBANA_URL_DOCKER
     )
     try:
-        # Preparing Elasticsearch and Kibana for data consumption
-        common.create_index(
+        if not common.wait_for_services(
+            es_url, kibana_url, timeout=glbs.SCRAPER_SERVICE_TIMEOUT
+        ):
+            raise ConnectionError("Elasticsearch or Kibana is not available")
+        # Uploading data into a new generation of the index, swapped in once loaded
+        common.rebuild_index(
             es_url,
             "bookings",
             validate.file(os.path.join(glbs.ES_MAPPINGS, "bookings_mapping.json")),
-            force=True,
+            OUTPUT_FILE,
         )
-        common.create_index_pattern(kibana_url, "bookings", force=True)
-        # Uploading data into Elasticsearch
-        common.upload_to_es(es_url, OUTPUT_FILE)
+        if not common.index_pattern_exists(kibana_url, "bookings"):
+            common.create_index_pattern(kibana_url, "bookings")
     except Exception as ex:
-        if "index_not_found_exception: no such index [bookings]" in ex:
+        if "index_not_found_exception: no such index [bookings]" in str(ex):
             logger.warning(
                 "Unable to update bookings to Elasticsearch. "
                 "Please use 'climb.py update' to manually update the information. "
@@ -422,95 +965,108 @@ def update_es(location):
     )
 
 
-@logger.catch
-def main():
-    """Get reservation data based on command args."""
-    args = cmd_args.init()
-    # Variables
-    locations = {
-        "Altitude Gatineau": {
-            "url": "https://portal.rockgympro.com/portal/public/d8debad49996f64b9734856be4913a25/occupancy?&iframeid=occupancyCounter&fId=1658",  # noqa
-            "reservation": True,
-            "zone": {
-                "Annex": {
-                    "url": "https://app.rockgympro.com/b/widget/?a=offering&offering_guid=88c1f4559dcf48a8b4db0c062faad971&widget_guid=ce62e0ff738e4faf8042bafa71fa48e5&random=61c1e39ab0351&iframeid=&mode=p",  # noqa
-                    "capacity": 25,
-                },
-                "Main": {
-                    "url": "https://app.rockgympro.com/b/widget/?a=offering&offering_guid=14fa372e850d43f6a725aff3e0fef115&widget_guid=ce62e0ff738e4faf8042bafa71fa48e5&random=61c1e39aae36d&iframeid=&mode=p",  # noqa
-                    "capacity": 25,
-                },
-                "Basement": {
-                    "url": "https://app.rockgympro.com/b/widget/?a=offering&offering_guid=f3613ad8e2fd436f8aff84a0fc87e6ef&widget_guid=ce62e0ff738e4faf8042bafa71fa48e5&random=61c1e39aaf518&iframeid=&mode=p",  # noqa
-                    "capacity": 25,
-                },
-                "Training": {
-                    "url": "https://app.rockgympro.com/b/widget/?a=offering&offering_guid=e686357a778843b2b4afafefb36f3e72&widget_guid=ce62e0ff738e4faf8042bafa71fa48e5&random=61c1e39ab1534&iframeid=&mode=p",  # noqa
-                    "capacity": 8,
-                },
-            },
-        },
-        "Altitude Gatineau Capacity": {
-            "url": "https://portal.rockgympro.com/portal/public/d8debad49996f64b9734856be4913a25/occupancy?&iframeid=occupancyCounter&fId=1658",  # noqa
-            "reservation": False,
-        },
-        "Altitude Kanata": {
-            "url": "https://portal.rockgympro.com/portal/public/d8debad49996f64b9734856be4913a25/occupancy?&iframeid=occupancyCounter&fId=1748",  # noqa
-            "reservation": False,
-        },
-        "Coyote Rock Gym": {
-            "url": "https://app.rockgympro.com/b/widget/?a=offering&offering_guid=2fdc519b5db6455f84c3a687d0a40c64&random=5f79eb6c8450f&iframeid=&mode=p",  # noqa
-            "reservation": True,
-            "capacity": 80,
-        },
-    }
-    driver = get_driver()
-    for name in args.locations:
-        name = name.replace("_", " ").strip()
-        # Used to account for 2 types of rgpro systems, capacity vs reservation
-        if locations[name]["reservation"]:
-            # Used to account for 2 types of booking, zones vs regular
-            if "zone" in locations[name]:
-                # Variable to check if first sub booking has been inserted
-                first = True
-                booking = None
-                for zone_name in locations[name]["zone"]:
-                    capacity = locations[name]["zone"][zone_name]["capacity"]
-                    url = locations[name]["zone"][zone_name]["url"]
-                    sub_booking = get_rgpro_bookings(
-                        driver, name, capacity, url, zone=zone_name
-                    )
-                    if first:
-                        booking = sub_booking.copy()
-                        first = False
-                    else:
-                        booking["availability"] += sub_booking["availability"]
-                        booking["reserved_spots"] += sub_booking["reserved_spots"]
-                        booking["capacity"] += sub_booking["capacity"]
-                        booking["percent_full"] = (
-                            booking["reserved_spots"] / booking["capacity"]
-                        ) * 100
-                        booking["zone"] = None
-                    # Updating the zone, will update the full booking after
-                    common.update_bulk_api(sub_booking, OUTPUT_FILE, "bookings")
-                    # If the config file is setup, push to Firestore too
-                    if config.firestore_json:
-                        update_firestore(sub_booking)
-            else:
-                booking = get_rgpro_bookings(
-                    driver, name, locations[name]["capacity"], locations[name]["url"]
-                )
-        else:
-            booking = get_capacity(
-                driver, name.replace("Capacity", "").strip(), locations[name]["url"]
+def scrape(executor, drivers, names, args):
+    """
+    Scrape the booking information of locations and upload it.
+
+    Pages are scraped concurrently, but saved in the order of the locations.
+
+    :param executor: pool of threads scraping pages
+    :param drivers: Selenium drivers of the pool
+    :param names: requested locations (ie. Altitude_Kanata)
+    :param args: command line arguments
+    :type executor: ThreadPoolExecutor
+    :type drivers: DriverPool
+    :type names: list of str
+    :type args: dict
+    """
+    names = [name.replace("_", " ").strip() for name in names]
+    pages = submit_pages(executor, drivers, list(dict.fromkeys(names)), LOCATIONS, args)
+    for name, futures in pages.items():
+        results = [future.result() for future in futures]
+        # Used to account for 3 types of pages, zones vs portal vs regular
+        if "zone" in LOCATIONS[name]:
+            for sub_booking in results:
+                # Updating the zone, will update the full booking after
+                common.update_bulk_api(sub_booking, OUTPUT_FILE, "bookings")
+                # If the config file is setup, push to Firestore too
+                if config.firestore_json:
+                    update_firestore(sub_booking)
+            booking = merge_zones(results)
+        elif not LOCATIONS[name]["reservation"] and get_facility(name):
+            location = name.replace("Capacity", "").strip()
+            data, read_at = results[0]
+            booking = capacity_booking(
+                location,
+                *read_occupancy(location, data[get_facility(location)]),
+                read_at,
             )
+        else:
+            booking = results[0]
         # Logging and saving info
         common.update_bulk_api(booking, OUTPUT_FILE, "bookings")
         # If the config file is setup, push to Firestore too
         if config.firestore_json:
             update_firestore(booking)
-    driver.quit()
-    update_es(args.locations)
+    update_es(names)
+
+
+def run_daemon(args):
+    """
+    Scrape locations on a schedule until stopped by SIGTERM or SIGINT.
+
+    The interpreter, clients and browsers stay alive between runs, instead of
+    starting a new process for every run.
+
+    :param args: command line arguments
+    :type args: dict
+    """
+    jobs = scheduler.load_schedule(args.schedule, OUTPUT_FILE)
+    for job in jobs:
+        for name in job.locations:
+            if name.replace("_", " ").strip() not in LOCATIONS:
+                logger.error(f"Unknown location '{name}' in job '{job.name}'")
+                sys.exit(1)
+    drivers = DriverPool()
+
+    def run(due):
+        logger.info(f"Running {', '.join(job.name for job in due)}...")
+        try:
+            scrape(
+                executor, drivers, [name for job in due for name in job.locations], args
+            )
+        except BaseException:
+            # Browsers may be left in a bad state, start new ones on the next run
+            drivers.quit()
+            raise
+
+    daemon = scheduler.Scheduler(jobs, run)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    signal.signal(signal.SIGINT, daemon.stop)
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            daemon.run_forever()
+    finally:
+        drivers.quit()
+    logger.info("Scheduler stopped")
+
+
+@logger.catch
+def main():
+    """Get reservation data based on command args."""
+    # Importing the scraper (ie. in tests) leaves logging alone
+    setup_logging()
+    args = cmd_args.init()
+    if args.daemon:
+        run_daemon(args)
+        return
+    # Chrome is only started by the threads that need it
+    drivers = DriverPool()
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            scrape(executor, drivers, args.locations, args)
+    finally:
+        drivers.quit()
 
 
 if __name__ == "__main__":
@@ -9,4 +9,7 @@ printenv | grep -v "no_proxy" >> /etc/environment
 poetry install --no-interaction --no-ansi
 # cron already running from dockerfile
 # Setup cron job
-cron && tail -f /workspace/logs/webscraper/cron.log
\ No newline at end of file
+cron
+# Booking jobs run in a single long-lived process, see env/schedule.yaml
+mkdir -p /workspace/logs/webscraper
+cd /workspace && DOCKER_SCRAPER=true TZ=America/Toronto exec /usr/local/bin/poetry run bookings --daemon >> /workspace/logs/webscraper/cron.log 2>&1
\ No newline at end of file
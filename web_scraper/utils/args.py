@@ -4,6 +4,8 @@
 import argparse
 import sys
 
+import common.globals as glbs
+
 
 def init():
     """Parse command args for climb.py."""
@@ -23,11 +25,61 @@ def init():
         nargs="+",
         dest="locations",
         metavar="location(s)",
-        required=True,
         help="Climbing Gym locations [Altitude_Gatineau, "
         "Altitude_Kanata, Coyote_Rock_Gym]",
     )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        dest="daemon",
+        help="Keep running and scrape the locations of a schedule file",
+    )
+    parser.add_argument(
+        "--schedule",
+        default=glbs.SCRAPER_SCHEDULE,
+        dest="schedule",
+        metavar="path",
+        help=f"Schedule file used with --daemon (Default: {glbs.SCRAPER_SCHEDULE})",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=glbs.SCRAPER_PAGE_TIMEOUT,
+        dest="timeout",
+        metavar="seconds",
+        help="Seconds to wait for a booking page to be ready"
+        f" (Default: {glbs.SCRAPER_PAGE_TIMEOUT})",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=glbs.SCRAPER_POLL_INTERVAL,
+        dest="poll_interval",
+        metavar="seconds",
+        help="Seconds between checks of a booking page"
+        f" (Default: {glbs.SCRAPER_POLL_INTERVAL})",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=glbs.SCRAPER_WORKERS,
+        dest="workers",
+        metavar="workers",
+        help="Number of pages scraped at once, each one may start a browser"
+        f" (Default: {glbs.SCRAPER_WORKERS})",
+    )
+    parser.add_argument(
+        "--selenium",
+        action="store_true",
+        dest="selenium",
+        help="Always read occupancy pages with a browser instead of a request",
+    )
     parsed = parser.parse_args()
+    if parsed.daemon:
+        return parsed
+    if not parsed.locations:
+        parser.error("the following arguments are required: -l")
     # Checking for choices after parsing because '\r' is present in cronjobs
     choices = [
         "Altitude_Gatineau",
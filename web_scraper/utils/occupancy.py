@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+"""Read the live occupancy of RockGymPro facilities without a browser."""
+import re
+from urllib.parse import urlsplit
+
+import requests
+
+import common.globals as glbs
+
+# The occupancy portal embeds its numbers in an inline script, ie.
+# var data = {'GAT' : {'capacity' : 150, 'count' : 52, ...}, ...};
+_DATA = re.compile(r"var\s+data\s*=\s*(?=\{)")
+# Strings, numbers, names and punctuation of a javascript object literal
+_TOKEN = re.compile(
+    r"""\s*(?:'((?:[^'\\]|\\.)*)'"""
+    r"""|"((?:[^"\\]|\\.)*)"|(-?\d+(?:\.\d+)?)|([\w$]+)|(\S))""",
+    re.DOTALL,
+)
+_ESCAPE = re.compile(r"\\(.)", re.DOTALL)
+_KEYWORDS = {"true": True, "false": False, "null": None}
+# Keep-alive connections shared by every request of a run
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": glbs.SCRAPER_USER_AGENT})
+
+
+def _tokenize(text, position):
+    """
+    Split a javascript object literal into tokens.
+
+    :param text: text containing the object
+    :param position: index of the opening brace of the object
+    :type text: str
+    :type position: int
+    :return: generator of token types (string, number, name or the punctuation
+        itself) and values
+    :rtype: generator of tuple
+    """
+    while True:
+        match = _TOKEN.match(text, position)
+        if not match:
+            return
+        position = match.end()
+        single, double, number, name, punctuation = match.groups()
+        if single is not None or double is not None:
+            yield "string", _ESCAPE.sub(r"\1", double if single is None else single)
+        elif number:
+            yield "number", float(number) if "." in number else int(number)
+        elif name:
+            yield "name", _KEYWORDS.get(name, name)
+        else:
+            yield punctuation, punctuation
+
+
+def _parse_object(tokens):
+    """
+    Parse the tokens of a javascript object literal, after its opening brace.
+
+    :param tokens: tokens of the object
+    :type tokens: generator of tuple
+    :raises ValueError: the object is malformed
+    :return: fields of the object
+    :rtype: dict
+    """
+    fields = {}
+    while True:
+        kind, key = next(tokens)
+        # A trailing comma can be followed by the closing brace
+        if kind == "}":
+            return fields
+        if kind not in ("string", "number", "name") or next(tokens)[0] != ":":
+            raise ValueError(f"unexpected '{key}' in occupancy data")
+        kind, value = next(tokens)
+        if kind == "{":
+            value = _parse_object(tokens)
+        elif kind not in ("string", "number", "name"):
+            raise ValueError(f"unexpected '{value}' in occupancy data")
+        fields[str(key)] = value
+        kind, separator = next(tokens)
+        if kind == "}":
+            return fields
+        if kind != ",":
+            raise ValueError(f"unexpected '{separator}' in occupancy data")
+
+
+def parse_occupancy(html):
+    """
+    Extract the occupancy data of every facility from an occupancy page.
+
+    :param html: contents of the occupancy page
+    :type html: str
+    :raises ValueError: the page doesn't contain occupancy data
+    :return: fields of every facility (ie. count and capacity), keyed by code
+    :rtype: dict of dict
+    """
+    match = _DATA.search(html)
+    if not match:
+        raise ValueError("occupancy data not found in page")
+    tokens = _tokenize(html, match.end())
+    next(tokens)
+    try:
+        data = _parse_object(tokens)
+    except StopIteration:
+        raise ValueError("occupancy data is incomplete") from None
+    facilities = {
+        code: fields for code, fields in data.items() if isinstance(fields, dict)
+    }
+    if not facilities:
+        raise ValueError("occupancy data has no facilities")
+    return facilities
+
+
+def fetch_occupancy(url, timeout=glbs.SCRAPER_PAGE_TIMEOUT):
+    """
+    Download an occupancy page and extract the data of every facility.
+
+    :param url: RockGymPro occupancy url
+    :param timeout: seconds to wait for a response
+    :type url: str
+    :type timeout: float
+    :raises requests.RequestException: unable to download the page
+    :raises ValueError: the page doesn't contain occupancy data
+    :return: fields of every facility, keyed by code
+    :rtype: dict of dict
+    """
+    response = _SESSION.get(url, timeout=timeout)
+    response.raise_for_status()
+    return parse_occupancy(response.text)
+
+
+def get_portal(url):
+    """
+    Return the occupancy portal of a url, shared by the facilities it lists.
+
+    :param url: RockGymPro occupancy url (ie. .../occupancy?fId=1658)
+    :type url: str
+    :return: url without its query
+    :rtype: str
+    """
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}{parts.path}"
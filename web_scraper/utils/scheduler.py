@@ -0,0 +1,422 @@
+#!/usr/bin/python3
+"""An in-process scheduler running scraping jobs from cron expressions."""
+import os
+import statistics
+import sys
+import threading
+from datetime import datetime, timedelta
+
+from loguru import logger
+
+import common.common as common
+import common.globals as glbs
+
+# Range of every field of a cron expression: minute, hour, day, month, weekday
+_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+# Years searched for the next run, enough to reach the next February 29th
+_MAX_YEARS = 5
+# Adaptive intervals divide an hour or a day evenly, so runs land on the same minutes
+_MINUTES_PER_DAY = 24 * 60
+
+
+def _parse_field(field, low, high):
+    """
+    Parse a field of a cron expression (ie. *, */30, 9-22, 1,15).
+
+    :param field: field of a cron expression
+    :param low: smallest value of the field
+    :param high: largest value of the field
+    :type field: str
+    :type low: int
+    :type high: int
+    :raises ValueError: Invalid field
+    :return: every value the field matches
+    :rtype: frozenset of int
+    """
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step = part.split("/", 1)
+            step = int(step)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(value) for value in part.split("-", 1))
+        else:
+            start = int(part)
+            end = high if step != 1 else start
+        if not low <= start <= end <= high or step < 1:
+            raise ValueError(f"'{field}' is out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronExpression:
+    """
+    A cron expression, ie. '*/30 9-22 * * *'.
+
+    Fields are minute, hour, day of month, month and day of week (0 or 7 is
+    Sunday). Like cron, when both days are restricted either one can match.
+
+    :param expression: cron expression with 5 fields
+    :type expression: str
+    :raises ValueError: Invalid expression
+    """
+
+    def __init__(self, expression):
+        """Parse a cron expression."""
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"'{expression}' must have 5 fields")
+        self.expression = expression
+        minutes, hours, self.days, self.months, weekdays = (
+            _parse_field(field, *limits) for field, limits in zip(fields, _FIELDS)
+        )
+        self.minutes = sorted(minutes)
+        self.hours = sorted(hours)
+        self.weekdays = frozenset(weekday % 7 for weekday in weekdays)
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def __repr__(self):
+        """Return the expression."""
+        return f"CronExpression('{self.expression}')"
+
+    def matches_day(self, date):
+        """
+        Check if the expression can run on a day.
+
+        :param date: day to check
+        :type date: date
+        :return: True if the expression runs at least once that day
+        :rtype: bool
+        """
+        if date.month not in self.months:
+            return False
+        day = date.day in self.days
+        # Python starts weeks on Monday, cron on Sunday
+        weekday = (date.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, time):
+        """
+        Return the first time the expression runs after a given time.
+
+        :param time: time to start from, excluded
+        :type time: datetime
+        :raises ValueError: The expression never runs (ie. February 30th)
+        :return: time of the next run, to the minute
+        :rtype: datetime
+        """
+        start = time.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.replace(hour=0, minute=0)
+        for __ in range(366 * _MAX_YEARS):
+            if self.matches_day(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        candidate = day.replace(hour=hour, minute=minute)
+                        if candidate >= start:
+                            return candidate
+            day += timedelta(days=1)
+        raise ValueError(f"'{self.expression}' never runs")
+
+
+class Job:
+    """
+    Locations scraped on a schedule.
+
+    :param name: name of the job, used in logs
+    :param schedule: one or more cron expressions
+    :param locations: locations scraped by the job
+    :type name: str
+    :type schedule: list of str
+    :type locations: list of str
+    :raises ValueError: Invalid cron expression
+    """
+
+    def __init__(self, name, schedule, locations):
+        """Create a job."""
+        self.name = name
+        self.crons = [CronExpression(expression) for expression in schedule]
+        self.locations = list(locations)
+
+    def next_after(self, time):
+        """
+        Return the first time the job runs after a given time.
+
+        :param time: time to start from, excluded
+        :type time: datetime
+        :return: time of the next run
+        :rtype: datetime
+        """
+        return min(cron.next_after(time) for cron in self.crons)
+
+
+class Scheduler:
+    """
+    Run jobs whenever they're due, until stopped.
+
+    Jobs due at the same time are run together. A run that starts late (ie. the
+    machine was asleep) covers every time it missed, and times that pass while a
+    run takes too long are caught up with a single run instead of one run for
+    each missed time.
+
+    :param jobs: jobs to run
+    :param run: Function of the jobs that are due
+    :param max_sleep: longest time to sleep between checks, in seconds
+    :type jobs: list of Job
+    :type run: function
+    :type max_sleep: float
+    """
+
+    def __init__(self, jobs, run, max_sleep=glbs.SCRAPER_MAX_SLEEP):
+        """Create a scheduler, nothing runs until run_forever is called."""
+        self.jobs = jobs
+        self.run = run
+        self.max_sleep = max_sleep
+        self.stopping = threading.Event()
+
+    def stop(self, *__):
+        """Stop once the current run is done, can be used as a signal handler."""
+        if not self.stopping.is_set():
+            logger.info("Stopping scheduler once the current run is done...")
+        self.stopping.set()
+
+    def run_forever(self):
+        """Run jobs whenever they're due, until stop is called."""
+        now = datetime.now()
+        next_runs = {job: job.next_after(now) for job in self.jobs}
+        for job, next_run in next_runs.items():
+            logger.info(f"['{job.name}'] Next run at {next_run:%Y-%m-%d %H:%M}")
+        while not self.stopping.is_set():
+            now = datetime.now()
+            due = [job for job in self.jobs if next_runs[job] <= now]
+            if not due:
+                sleep = (min(next_runs.values()) - now).total_seconds()
+                self.stopping.wait(min(max(sleep, 0), self.max_sleep))
+                continue
+            started = datetime.now()
+            try:
+                self.run(due)
+            except (Exception, SystemExit) as ex:
+                # A failed run is already logged, keep running the next ones
+                logger.warning(f"Run of {', '.join(job.name for job in due)} failed")
+                logger.debug(repr(ex))
+            finished = datetime.now()
+            for job in due:
+                # A late run covers every time up to when it started
+                next_run = job.next_after(started)
+                missed = []
+                while next_run <= finished:
+                    missed.append(next_run)
+                    next_run = job.next_after(next_run)
+                if missed:
+                    logger.warning(
+                        f"['{job.name}'] Missed {len(missed)} run(s) since"
+                        f" {missed[0]:%Y-%m-%d %H:%M}, catching up with a single run..."
+                    )
+                    # Due right away, the following run is computed from it
+                    next_run = missed[-1]
+                next_runs[job] = next_run
+
+
+def load_occupancy_history(path, locations, since):
+    """
+    Read the occupancy of locations from the booking history, by weekday and hour.
+
+    Only live occupancy is read, reservations of time slots are ignored.
+
+    :param path: path to the bookings bulk json
+    :param locations: booking locations (ie. Altitude Gatineau)
+    :param since: ignore occupancy read before this time
+    :type path: str
+    :type locations: list of str
+    :type since: datetime
+    :return: percent_full samples, keyed by weekday (Monday is 0) and hour
+    :rtype: dict of list of float
+    """
+    history = {}
+    if not os.path.exists(path):
+        return history
+    for booking in common.iter_bulk_json(path):
+        if (
+            booking.get("location") not in locations
+            or "time_slot" in booking
+            or booking.get("percent_full") is None
+            or not booking.get("retrieved_at")
+        ):
+            continue
+        retrieved_at = datetime.fromisoformat(booking["retrieved_at"])
+        if retrieved_at >= since:
+            key = (retrieved_at.weekday(), retrieved_at.hour)
+            history.setdefault(key, []).append(booking["percent_full"])
+    return history
+
+
+class AdaptiveJob(Job):
+    """
+    Occupancy scraped more often during hours when it historically varies.
+
+    The standard deviation of percent_full at every weekday and hour of the
+    booking history sets the interval between runs: the most volatile hour is
+    sampled every min_interval minutes, a flat one every max_interval minutes.
+    Hours without enough history are sampled every max_interval minutes.
+
+    Intervals are rounded to divisors of an hour (or of a day, past an hour) so
+    runs land on the same minutes every hour (ie. :00, :15, :30, :45). Runs are
+    limited to the times of the cron expressions (ie. '* 9-22 * * *'), the job
+    runs at the first of them in every interval (ie. '*/30' with a 20 minute
+    interval runs at :00 and :30).
+
+    :param name: name of the job, used in logs
+    :param schedule: one or more cron expressions, when the job can run
+    :param locations: locations scraped by the job
+    :param history: path to the bookings bulk json
+    :param min_interval: shortest time between runs, in minutes
+    :param max_interval: longest time between runs, in minutes
+    :param history_weeks: weeks of history used to compute intervals
+    :type name: str
+    :type schedule: list of str
+    :type locations: list of str
+    :type history: str
+    :type min_interval: int
+    :type max_interval: int
+    :type history_weeks: int
+    :raises ValueError: Invalid cron expression or intervals
+    """
+
+    def __init__(
+        self,
+        name,
+        schedule,
+        locations,
+        history,
+        min_interval=glbs.SCRAPER_MIN_INTERVAL,
+        max_interval=glbs.SCRAPER_MAX_INTERVAL,
+        history_weeks=glbs.SCRAPER_HISTORY_WEEKS,
+    ):
+        """Create an adaptive job, the history is read when it's first scheduled."""
+        super().__init__(name, schedule, locations)
+        self.intervals = [
+            interval
+            for interval in range(max(min_interval, 1), max_interval + 1)
+            if (60 if interval <= 60 else _MINUTES_PER_DAY) % interval == 0
+            and (interval <= 60 or interval % 60 == 0)
+        ]
+        if not self.intervals:
+            raise ValueError(
+                f"no interval of {min_interval}-{max_interval} minutes divides an hour"
+            )
+        self.history = history
+        self.history_weeks = history_weeks
+        # Occupancy documents use the name of the location, without the page type
+        self.booking_locations = [
+            location.replace("_", " ").replace("Capacity", "").strip()
+            for location in self.locations
+        ]
+        self.history_mtime = None
+        self.deviations = {}
+
+    def refresh(self):
+        """Compute the volatility of every hour again if the history has changed."""
+        mtime = os.path.getmtime(self.history) if os.path.exists(self.history) else None
+        if mtime == self.history_mtime:
+            return
+        self.history_mtime = mtime
+        history = load_occupancy_history(
+            self.history,
+            self.booking_locations,
+            datetime.now() - timedelta(weeks=self.history_weeks),
+        )
+        self.deviations = {
+            key: statistics.pstdev(samples)
+            for key, samples in history.items()
+            if len(samples) >= glbs.SCRAPER_MIN_SAMPLES
+        }
+        logger.debug(
+            f"['{self.name}'] Intervals computed from {len(self.deviations)} hour(s)"
+            " of occupancy history"
+        )
+
+    def interval(self, time):
+        """
+        Return the minutes between runs during the hour of a given time.
+
+        :param time: time of the run
+        :type time: datetime
+        :return: interval in minutes
+        :rtype: int
+        """
+        highest = max(self.deviations.values(), default=0)
+        deviation = self.deviations.get((time.weekday(), time.hour))
+        if not highest or deviation is None:
+            return self.intervals[-1]
+        low, high = self.intervals[0], self.intervals[-1]
+        target = high - (high - low) * deviation / highest
+        return min(self.intervals, key=lambda interval: abs(interval - target))
+
+    def next_after(self, time):
+        """
+        Return the first time the job runs after a given time.
+
+        :param time: time to start from, excluded
+        :type time: datetime
+        :return: time of the next run
+        :rtype: datetime
+        """
+        self.refresh()
+        while True:
+            candidate = super().next_after(time)
+            interval = self.interval(candidate)
+            start = candidate - timedelta(
+                minutes=(candidate.hour * 60 + candidate.minute) % interval
+            )
+            if time < start:
+                return candidate
+            # Already ran in this interval, look from the end of it
+            time = start + timedelta(minutes=interval - 1)
+
+
+def load_schedule(path, history):
+    """
+    Load the jobs of a schedule file.
+
+    Every job has a name, a cron expression (or a list of them) and the
+    locations it scrapes. Jobs with an 'adaptive' section run at intervals
+    computed from the booking history (see AdaptiveJob).
+
+    :param path: path to the schedule yaml
+    :param history: path to the bookings bulk json, used by adaptive jobs
+    :type path: str
+    :type history: str
+    :raises Exception: Invalid schedule
+    :return: jobs of the schedule
+    :rtype: list of Job
+    """
+    content = common.load_yaml(path) or {}
+    jobs = []
+    for index, job in enumerate(content.get("jobs") or []):
+        try:
+            schedule = job["schedule"]
+            options = (
+                job.get("name") or f"job {index + 1}",
+                [schedule] if isinstance(schedule, str) else schedule,
+                job["locations"],
+            )
+            adaptive = job.get("adaptive")
+            if adaptive:
+                # 'adaptive: true' uses the default intervals
+                adaptive = adaptive if isinstance(adaptive, dict) else {}
+                jobs.append(AdaptiveJob(*options, history, **adaptive))
+            else:
+                jobs.append(Job(*options))
+        except (KeyError, TypeError, ValueError) as ex:
+            logger.error(f"Invalid job #{index + 1} in '{path}': {ex!r}")
+            sys.exit(1)
+    if not jobs:
+        logger.error(f"No jobs found in '{path}'")
+        sys.exit(1)
+    return jobs
@@ -12,6 +12,7 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__fil
 sys.path.append(BASE_DIR)
 import common.common as common  # noqa
 import common.globals as glbs  # noqa
+import common.session as session  # noqa
 import config as config  # noqa
 
 # Logging
@@ -26,104 +27,40 @@ logger.add(
 
 def create_locations(db):
     """
-    Create location collection with the 3 local gyms.
+    Create location collection with the gyms that have a capacity.
 
     :param db: firestore database
     :return: Dict of location references
     :rtype: dict of ref
     """
-    # Basic Location information
-    locations = [
-        {
-            "name": "Altitude Kanata",
-            "address": "0E5, 501 Palladium Dr, Kanata, ON K2V 0E5",
-            "city": "Ottawa",
-            "province": "Ontario",
-            "country": "Canada",
-            "postal": "K2V 0E5",
-            "location": firestore.GeoPoint(45.297970, -75.911150),
-            "grading_scale": [
-                "VB/V0",
-                "V0/V1",
-                "V1/V2",
-                "V2/V3",
-                "V3/V4",
-                "V4/V5",
-                "V5/V6",
-                "V6/V7",
-                "V7/V8",
-                "V8/V9",
-                "V9+",
-                "Kids - VB/V0",
-                "Kids - V0/V1",
-                "Kids - V1/V2",
-                "Kids - V2/V3",
-                "Kids - V3/V4",
-                "Kids - V4/V5",
-                "Kids - V5/V6",
-                "Kids - V6/V7",
-                "Kids - V7/V8",
-                "Kids - V8/V9",
-                "Kids - V9+",
-                "competition",
-                "routesetting-squad",
-            ],
-            "capacity": 50,
-        },
-        {
-            "name": "Altitude Gatineau",
-            "address": "35 Boulevard Saint-Raymond, Gatineau, QC J8Y 1R5",
-            "city": "Gatineau",
-            "province": "Quebec",
-            "country": "Canada",
-            "postal": "J8Y 1R5",
-            "location": firestore.GeoPoint(45.446861, -75.736801),
-            "grading_scale": [
-                "VB/V0",
-                "V0/V1",
-                "V1/V2",
-                "V2/V3",
-                "V3/V4",
-                "V4/V5",
-                "V5/V6",
-                "V6/V7",
-                "V7/V8",
-                "V8/V9",
-                "V9+",
-                "competition",
-                "routesetting-squad",
-            ],
-            "capacity": 75,
-        },
-        {
-            "name": "Coyote Rock Gym",
-            "address": "1737B St Laurent Blvd, Ottawa, ON K1G 3V4",
-            "city": "Ottawa",
-            "province": "Ontario",
-            "country": "Canada",
-            "postal": "K1G 3V4",
-            "location": firestore.GeoPoint(45.406130, -75.625500),
-            "grading_scale": [
-                "White",
-                "Orange",
-                "Red",
-                "Blue",
-                "Green",
-                "Purple",
-                "Black",
-                "Ungraded",
-            ],
-            "capacity": 50,
-        },
-    ]
     # Loop through locations and create a new document in firestore
     location_dict = {}
-    for location in locations:
+    for location in session.get_locations():
+        if location.capacity is None:
+            continue
+        # Kids grades are only listed for the gyms that track them separately
+        grading_scale = [
+            grade
+            for grade in location.grading
+            if location.has_kids_grades or not grade.startswith("Kids - ")
+        ]
         doc_ref = db.collection("locations").document()
-        location_dict[location["name"]] = doc_ref
-        doc_ref.set(location)
+        location_dict[location.name] = doc_ref
+        doc_ref.set(
+            {
+                "name": location.name,
+                "address": location.address,
+                "city": location.city,
+                "province": location.province,
+                "country": location.country,
+                "postal": location.postal,
+                "location": firestore.GeoPoint(location.lat, location.lon),
+                "grading_scale": grading_scale,
+                "capacity": location.capacity,
+            }
+        )
         logger.info(
-            f"[Document ID: {doc_ref.id}] {location['name']}'s "
+            f"[Document ID: {doc_ref.id}] {location.name}'s "
             "location data has been added to the db."
         )
 